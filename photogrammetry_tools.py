@@ -1,19 +1,2372 @@
 import os
 import math
+import time
+import json
+import queue
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from qgis.PyQt.QtWidgets import (QDockWidget, QPushButton, QVBoxLayout, QWidget,
                                  QFileDialog, QMessageBox, QHBoxLayout, QLabel,
                                  QAction, QFrame, QComboBox, QLineEdit,
                                  QGroupBox, QInputDialog, QRadioButton, QButtonGroup,
-                                 QSpinBox, QDialog, QDialogButtonBox, QTextEdit)
+                                 QSpinBox, QDialog, QDialogButtonBox, QTextEdit,
+                                 QCheckBox, QTableWidget, QTableWidgetItem)
 from qgis.PyQt import QtGui
-from qgis.PyQt.QtCore import Qt
+from qgis.PyQt.QtCore import Qt, QTimer
 from qgis.core import (QgsVectorLayer, QgsProject, QgsRectangle, QgsFeature,
                        QgsGeometry, QgsVectorFileWriter, QgsFields, QgsField,
                        QgsCoordinateReferenceSystem, QgsWkbTypes, QgsPointXY,
-                       QgsCoordinateTransform, QgsUnitTypes)
+                       QgsCoordinateTransform, QgsUnitTypes, QgsFeatureRequest,
+                       QgsFeedback, QgsVectorDataProvider, QgsTask, QgsApplication,
+                       QgsSpatialIndex, QgsVectorLayerFeatureSource, QgsProcessingContext,
+                       QgsProcessingFeedback, QgsProcessingAlgRunnerTask, QgsProviderRegistry,
+                       QgsDataProvider, NULL)
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QVariant
-import processing
+
+# Features read per chunk (and per MiniBatchKMeans step) by the streaming engine
+STREAMING_BATCH_SIZE = 8192
+# Bits per axis of the Hilbert curve grid (2^16 x 2^16 cells)
+HILBERT_ORDER = 16
+# Lower bound on MiniBatchKMeans updates, small layers are re-read to reach it
+STREAMING_MIN_UPDATES = 100
+STREAMING_MAX_EPOCHS = 5
+# Features handed to a file writer per addFeatures call by the streaming tools
+WRITER_BATCH_SIZE = 10000
+# Part files kept open at once by the single-pass writer (each shapefile holds 3 handles)
+MAX_OPEN_PART_WRITERS = 128
+# Default and upper bound for worker pools (part export, buffer engine)
+DEFAULT_EXPORT_WORKERS = min(8, os.cpu_count() or 1)
+MAX_EXPORT_WORKERS = max(1, os.cpu_count() or 1)
+# Features per chunk handed to a buffer worker
+BUFFER_CHUNK_SIZE = 2000
+# Segments per quarter circle: fixed default and bounds of the adaptive mode
+BUFFER_SEGMENTS = 50
+BUFFER_MIN_SEGMENTS = 2
+BUFFER_MAX_SEGMENTS = 100
+# Features buffered twice to compare adaptive against fixed segments
+BUFFER_SAMPLE_SIZE = 200
+# Seconds between resident memory samples taken while a streaming tool runs
+MEMORY_SAMPLE_INTERVAL = 0.05
+# Segments per query batch of the native line intersection engine
+SEGMENT_BATCH_SIZE = 20000
+# Segments spanning more grid cells than this are matched by bounding box scan
+SEGMENT_GRID_MAX_CELLS = 64
+# Slack on the segment parameters so crossings exactly at vertices are not missed
+SEGMENT_PARAMETER_EPSILON = 1e-9
+# Intersection points of one feature pair closer than this (map units) are reported once
+INTERSECTION_TOLERANCE = 1e-6
+# Feature batches a merge reader may queue ahead of the writer, per input layer
+MERGE_QUEUE_BATCHES = 4
+# Selected feature ids fetched per request when exporting a selection
+SELECTION_PAGE_SIZE = 5000
+# Bridge fields held by the attribute cache, together with every Geo_* seamline field
+CACHED_FIELDS = ("Part", "Assign", "Status", "Remarks", "QC", "QCRemarks", "Rework")
+# Quiet time after the last status click before write-behind edits are committed
+WRITE_BEHIND_DELAY_MS = 10000
+# QC dashboard columns: (label, field, value) as written by the status buttons
+DASHBOARD_COLUMNS = (
+    ("Done", "Status", "Done"),
+    ("Not Done", "Status", "Not Done"),
+    ("No Need", "Remarks", "No Need to Work"),
+    ("Smart Geofill", "Remarks", "Smart Geofill"),
+    ("QC Done", "QC", "Done"),
+    ("QC Solved", "QC", "Solved"),
+    ("QC Smart Geofill", "QCRemarks", "Smart Geofill"),
+)
+
+
+def _to_int_value(value):
+    """Integer field value, NULL instead of empty or invalid input"""
+    if value == "" or value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_float_value(value):
+    """Double field value, NULL instead of empty or invalid input"""
+    if value == "" or value is None:
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_string_value(value):
+    """String field value (and fallback for every other field type)"""
+    return str(value) if value is not None else ""
+
+
+FIELD_VALUE_CONVERTERS = {
+    QVariant.Int: _to_int_value,
+    QVariant.Double: _to_float_value,
+}
+
+
+def compile_conversion_plan(source_fields, target_fields):
+    """Compile the [(index, converter)] list for fields whose type changes.
+
+    Built once per layer so the per-feature loop does no field lookups or
+    type branching. An empty plan means the schemas match and attributes
+    can be copied unchanged.
+    """
+    plan = []
+    for index in range(min(source_fields.count(), target_fields.count())):
+        target_type = target_fields.at(index).type()
+        if source_fields.at(index).type() != target_type:
+            plan.append((index, FIELD_VALUE_CONVERTERS.get(target_type, _to_string_value)))
+    return plan
+
+
+def cluster_output_fields(source_fields):
+    """Fields of the part files: Int, Double and Bool are kept, everything else becomes String"""
+    fields = QgsFields()
+    for field in source_fields:
+        if field.type() in (QVariant.Int, QVariant.Double, QVariant.Bool):
+            field_type = field.type()
+        else:
+            field_type = QVariant.String
+        fields.append(QgsField(field.name(), field_type))
+    return fields
+
+
+def _clustering_point(geom, point_geometry):
+    """Coordinate used to cluster a feature: the point itself or its centroid"""
+    if point_geometry and not geom.isMultipart():
+        return geom.asPoint()
+    return geom.centroid().asPoint()
+
+
+def extract_feature_coordinates(source, point_geometry, feature_count=-1, feedback=None):
+    """Read feature ids and clustering coordinates into NumPy arrays.
+
+    Points use their own coordinates, everything else (and multipoints) the
+    centroid. Attributes are not requested and the arrays are preallocated
+    from ``feature_count`` so only geometries cross the provider boundary.
+    Reading stops early when ``feedback`` is cancelled.
+    """
+    import numpy as np
+
+    request = QgsFeatureRequest()
+    request.setNoAttributes()
+
+    capacity = feature_count if feature_count > 0 else 1024
+    coordinates = np.empty((capacity, 2), dtype=np.float64)
+    feature_ids = np.empty(capacity, dtype=np.int64)
+    count = 0
+
+    for feature in source.getFeatures(request):
+        geom = feature.geometry()
+        if geom.isEmpty():
+            continue
+
+        point = _clustering_point(geom, point_geometry)
+
+        # Feature counts can be estimates, grow instead of failing
+        if count == capacity:
+            capacity *= 2
+            coordinates.resize((capacity, 2), refcheck=False)
+            feature_ids.resize(capacity, refcheck=False)
+
+        coordinates[count] = (point.x(), point.y())
+        feature_ids[count] = feature.id()
+        count += 1
+
+        if feedback and count % 10000 == 0:
+            if feedback.isCanceled():
+                break
+            if feature_count > 0:
+                feedback.setProgress(50.0 * min(count / feature_count, 1.0))
+
+    return coordinates[:count], feature_ids[:count]
+
+
+def iter_coordinate_chunks(source, point_geometry, chunk_size):
+    """Yield (coordinates, feature_ids) arrays for consecutive chunks of features.
+
+    The same buffers are reused for every chunk, so consume or copy each
+    chunk before requesting the next one.
+    """
+    import numpy as np
+
+    request = QgsFeatureRequest()
+    request.setNoAttributes()
+
+    coordinates = np.empty((chunk_size, 2), dtype=np.float64)
+    feature_ids = np.empty(chunk_size, dtype=np.int64)
+    count = 0
+
+    for feature in source.getFeatures(request):
+        geom = feature.geometry()
+        if geom.isEmpty():
+            continue
+
+        point = _clustering_point(geom, point_geometry)
+        coordinates[count] = (point.x(), point.y())
+        feature_ids[count] = feature.id()
+        count += 1
+
+        if count == chunk_size:
+            yield coordinates, feature_ids
+            count = 0
+
+    if count:
+        yield coordinates[:count], feature_ids[:count]
+
+
+def grid_seed_centers(extent, n_clusters):
+    """Spread n_clusters starting centres over a near-square grid covering extent"""
+    import numpy as np
+
+    width = max(extent.width(), 1e-9)
+    height = max(extent.height(), 1e-9)
+    cols = max(1, int(math.ceil(math.sqrt(n_clusters * width / height))))
+    rows = max(1, int(math.ceil(n_clusters / cols)))
+
+    xs = extent.xMinimum() + (np.arange(cols) + 0.5) * width / cols
+    ys = extent.yMinimum() + (np.arange(rows) + 0.5) * height / rows
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    return np.column_stack((grid_x.ravel(), grid_y.ravel()))[:n_clusters]
+
+
+def streaming_kmeans_labels(source, point_geometry, n_clusters, extent, feature_count, feedback=None):
+    """Cluster features with MiniBatchKMeans.partial_fit while streaming the source.
+
+    Only one chunk of coordinates is held in memory at a time. The centres
+    start on a grid over ``extent`` (sources are often stored in spatial
+    order, so the first chunk is a poor sample), are refined over one or
+    more fitting passes and a final pass assigns the labels.
+
+    Returns (feature_ids, labels) arrays, or (None, None) when cancelled.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    import numpy as np
+
+    batch_size = max(STREAMING_BATCH_SIZE, 3 * n_clusters)
+    total = max(feature_count, 1)
+    epochs = min(STREAMING_MAX_EPOCHS,
+                 max(1, int(math.ceil(STREAMING_MIN_UPDATES * batch_size / total))))
+    passes = epochs + 1
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, init=grid_seed_centers(extent, n_clusters),
+                             n_init=1, batch_size=batch_size, random_state=42)
+
+    def report(pass_index, processed):
+        if feedback:
+            feedback.setProgress(100.0 * (pass_index + min(processed / total, 1.0)) / passes)
+
+    for epoch in range(epochs):
+        processed = 0
+        for coordinates, _ in iter_coordinate_chunks(source, point_geometry, batch_size):
+            if feedback and feedback.isCanceled():
+                return None, None
+            kmeans.partial_fit(coordinates)
+            processed += len(coordinates)
+            report(epoch, processed)
+
+    id_chunks = []
+    label_chunks = []
+    processed = 0
+    for coordinates, feature_ids in iter_coordinate_chunks(source, point_geometry, batch_size):
+        if feedback and feedback.isCanceled():
+            return None, None
+        id_chunks.append(feature_ids.copy())
+        label_chunks.append(kmeans.predict(coordinates).astype(np.int32))
+        processed += len(coordinates)
+        report(epochs, processed)
+
+    if not id_chunks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+    return np.concatenate(id_chunks), np.concatenate(label_chunks)
+
+
+def balanced_bisection_labels(coordinates, n_parts):
+    """Split coordinates into n_parts spatially compact parts of equal size.
+
+    Recursive coordinate bisection: each box is cut across its longer side at
+    the rank that keeps both halves proportional to the number of parts they
+    will hold. np.argpartition finds the cut in linear time, so the run is
+    O(N log n_parts) and every part gets floor(N / n_parts) or
+    ceil(N / n_parts) features.
+    """
+    import numpy as np
+
+    total = len(coordinates)
+    n_parts = max(1, min(n_parts, total))
+    base_size, extra = divmod(total, n_parts)
+
+    def parts_size(first_part, part_count):
+        # The first ``extra`` parts take one feature more than the others
+        return part_count * base_size + max(0, min(first_part + part_count, extra) - first_part)
+
+    labels = np.empty(total, dtype=np.int32)
+    stack = [(np.arange(total), 0, n_parts)]
+
+    while stack:
+        indices, first_part, part_count = stack.pop()
+        if part_count == 1:
+            labels[indices] = first_part
+            continue
+
+        left_parts = part_count // 2
+        left_size = parts_size(first_part, left_parts)
+
+        points = coordinates[indices]
+        axis = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        order = np.argpartition(points[:, axis], left_size - 1)
+
+        stack.append((indices[order[:left_size]], first_part, left_parts))
+        stack.append((indices[order[left_size:]], first_part + left_parts, part_count - left_parts))
+
+    return labels
+
+
+def hilbert_keys(coordinates, order=HILBERT_ORDER):
+    """Hilbert curve distance of each coordinate on a 2^order grid over their bounds.
+
+    Both axes share the scale of the larger span so the grid cells stay
+    square, otherwise runs of the curve become strips on elongated extents.
+    """
+    import numpy as np
+
+    side = 1 << order
+    mins = coordinates.min(axis=0)
+    span = max(float((coordinates.max(axis=0) - mins).max()), 1e-9)
+    cells = ((coordinates - mins) / span * (side - 1)).astype(np.int64)
+    x = cells[:, 0]
+    y = cells[:, 1]
+
+    keys = np.zeros(len(coordinates), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        keys += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+
+        # Rotate the quadrant so the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, x ^ (side - 1), x)
+        y = np.where(flip, y ^ (side - 1), y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= 1
+
+    return keys
+
+
+def hilbert_curve_labels(coordinates, n_parts):
+    """Cut the Hilbert order of coordinates into n_parts contiguous, equal-size runs.
+
+    Pure NumPy and O(N log N) (dominated by the sort), the sizes differ by
+    at most one feature.
+    """
+    import numpy as np
+
+    total = len(coordinates)
+    n_parts = max(1, min(n_parts, total))
+
+    order = np.argsort(hilbert_keys(coordinates), kind="stable")
+    labels = np.empty(total, dtype=np.int32)
+    labels[order] = (np.arange(total, dtype=np.int64) * n_parts // total).astype(np.int32)
+    return labels
+
+
+def labels_to_clusters(feature_ids, labels):
+    """Group feature ids by cluster label as {label: [feature ids]}"""
+    import numpy as np
+
+    if len(labels) == 0:
+        return {}
+
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = np.asarray(labels)[order]
+    boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+    starts = np.concatenate(([0], boundaries))
+    groups = np.split(np.asarray(feature_ids)[order], boundaries)
+
+    return {int(sorted_labels[start]): group.tolist() for start, group in zip(starts, groups)}
+
+
+def cluster_features(source, point_geometry, feature_count, extent, distribute_by_points,
+                     number_value, engine, feedback=None):
+    """Partition the features of ``source`` with the selected engine.
+
+    Returns (clusters, total_features, timings) with timings as a list of
+    (label, seconds), or None when cancelled. Raises ValueError when fewer
+    than two features can be clustered.
+    """
+    def part_count(total):
+        if distribute_by_points:
+            # By points per part
+            return max(1, int(math.ceil(total / number_value)))
+        # By number of parts
+        return min(number_value, total)
+
+    if engine == "minibatch":
+        if feature_count < 2:
+            raise ValueError("Need at least 2 features for clustering!")
+
+        fit_start = time.perf_counter()
+        feature_ids, labels = streaming_kmeans_labels(source, point_geometry, part_count(feature_count),
+                                                      extent, feature_count, feedback)
+        if feature_ids is None:
+            return None
+        fit_time = time.perf_counter() - fit_start
+        return labels_to_clusters(feature_ids, labels), len(feature_ids), [("Streaming Clustering", fit_time)]
+
+    # Extract coordinates from features
+    extract_start = time.perf_counter()
+    coordinates, feature_ids = extract_feature_coordinates(source, point_geometry, feature_count, feedback)
+    extract_time = time.perf_counter() - extract_start
+
+    if feedback and feedback.isCanceled():
+        return None
+    if len(coordinates) < 2:
+        raise ValueError("Need at least 2 features for clustering!")
+
+    n_clusters = part_count(len(coordinates))
+
+    fit_start = time.perf_counter()
+    if engine == "balanced":
+        # Size-constrained split, parts differ by at most one feature
+        cluster_labels = balanced_bisection_labels(coordinates, n_clusters)
+        fit_label = "Balanced Partitioning"
+    elif engine == "hilbert":
+        # Contiguous runs along the Hilbert curve of the coordinates
+        cluster_labels = hilbert_curve_labels(coordinates, n_clusters)
+        fit_label = "Hilbert Partitioning"
+    else:
+        # Perform K-means clustering
+        from sklearn.cluster import KMeans
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
+        cluster_labels = kmeans.fit_predict(coordinates)
+        fit_label = "Clustering"
+    fit_time = time.perf_counter() - fit_start
+
+    if feedback:
+        feedback.setProgress(100.0)
+
+    clusters = labels_to_clusters(feature_ids, cluster_labels)
+    return clusters, len(coordinates), [("Coordinate Extraction", extract_time), (fit_label, fit_time)]
+
+
+def driver_for_path(path):
+    """OGR driver name matching the extension of an output path"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".gpkg":
+        return "GPKG"
+    if extension == ".fgb":
+        return "FlatGeobuf"
+    return "ESRI Shapefile"
+
+
+def write_clustered_parts(source, source_fields, wkb_type, crs, transform_context, clusters,
+                          base_name, output_dir, feedback=None):
+    """Write each cluster to its own shapefile in a single pass over the source.
+
+    Every part gets an open file writer and each source feature goes
+    straight to the writer of its part, so only the current feature is
+    held in memory. Parts are handled MAX_OPEN_PART_WRITERS at a time
+    to stay within file handle limits. Returns ([(output_path, part_name)]
+    for the parts written, [error message] for the parts that failed).
+    """
+    fields = cluster_output_fields(source_fields)
+    conversion_plan = compile_conversion_plan(source_fields, fields)
+
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = "ESRI Shapefile"
+    save_options.fileEncoding = "UTF-8"
+
+    cluster_ids = sorted(clusters)
+    written_parts = []
+    errors = []
+    total = max(1, sum(len(feature_ids) for feature_ids in clusters.values()))
+    written = 0
+
+    for start in range(0, len(cluster_ids), MAX_OPEN_PART_WRITERS):
+        group = cluster_ids[start:start + MAX_OPEN_PART_WRITERS]
+        writers = {}
+        part_paths = {}
+        failed = set()
+        part_of_feature = {}
+
+        for cluster_id in group:
+            part_name = f"{base_name}_{cluster_id + 1}"
+            output_path = os.path.join(output_dir, f"{part_name}.shp")
+            writer = QgsVectorFileWriter.create(output_path, fields, wkb_type, crs, transform_context, save_options)
+            if writer.hasError() != QgsVectorFileWriter.NoError:
+                errors.append(f"{part_name}: {writer.errorMessage()}")
+                continue
+
+            writers[cluster_id] = writer
+            part_paths[cluster_id] = (output_path, part_name)
+            for feature_id in clusters[cluster_id]:
+                part_of_feature[feature_id] = cluster_id
+
+        out_feature = QgsFeature(fields)
+        for feature in source.getFeatures():
+            cluster_id = part_of_feature.get(feature.id())
+            if cluster_id is None:
+                continue
+
+            attributes = feature.attributes()
+            for index, converter in conversion_plan:
+                attributes[index] = converter(attributes[index])
+
+            out_feature.setGeometry(feature.geometry())
+            out_feature.setAttributes(attributes)
+            if not writers[cluster_id].addFeature(out_feature):
+                failed.add(cluster_id)
+
+            written += 1
+            if feedback and written % 1000 == 0:
+                if feedback.isCanceled():
+                    break
+                feedback.setProgress(100.0 * written / total)
+
+        for cluster_id in group:
+            if cluster_id in failed:
+                errors.append(f"{part_paths[cluster_id][1]}: {writers[cluster_id].errorMessage()}")
+            elif cluster_id in part_paths:
+                written_parts.append(part_paths[cluster_id])
+
+        # Deleting the writers flushes and closes the files
+        writers.clear()
+        if feedback and feedback.isCanceled():
+            break
+
+    return written_parts, errors
+
+
+def write_clustered_parts_parallel(provider_key, uri, source_fields, wkb_type, crs, transform_context,
+                                   clusters, base_name, output_dir, workers, feedback=None):
+    """Write each cluster to its own shapefile using a pool of worker threads.
+
+    Parts are independent, so every worker thread opens its own read-only
+    provider on ``uri`` and writes whole parts, fetching their features by
+    id. Only usable for sources that can be reopened from their URI (file
+    based OGR layers without pending edits). Returns ([(output_path,
+    part_name)] in cluster order, [error message]) like write_clustered_parts().
+    """
+    fields = cluster_output_fields(source_fields)
+    conversion_plan = compile_conversion_plan(source_fields, fields)
+
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = "ESRI Shapefile"
+    save_options.fileEncoding = "UTF-8"
+
+    total = max(1, sum(len(feature_ids) for feature_ids in clusters.values()))
+    progress = {"written": 0}
+    lock = threading.Lock()
+    thread_state = threading.local()
+    providers = []
+
+    def thread_provider():
+        # Providers are not thread safe, each worker thread reads through its own
+        provider = getattr(thread_state, "provider", None)
+        if provider is None:
+            provider = QgsProviderRegistry.instance().createProvider(provider_key, uri,
+                                                                     QgsDataProvider.ProviderOptions())
+            if provider is None or not provider.isValid():
+                raise RuntimeError(f"Could not open {uri} for reading")
+            thread_state.provider = provider
+            with lock:
+                providers.append(provider)
+        return provider
+
+    def write_part(cluster_id):
+        if feedback and feedback.isCanceled():
+            return None
+
+        part_name = f"{base_name}_{cluster_id + 1}"
+        output_path = os.path.join(output_dir, f"{part_name}.shp")
+        writer = QgsVectorFileWriter.create(output_path, fields, wkb_type, crs, transform_context, save_options)
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            return None, f"{part_name}: {writer.errorMessage()}"
+
+        request = QgsFeatureRequest().setFilterFids(clusters[cluster_id])
+        out_feature = QgsFeature(fields)
+        count = 0
+        error = None
+        for feature in thread_provider().getFeatures(request):
+            attributes = feature.attributes()
+            for index, converter in conversion_plan:
+                attributes[index] = converter(attributes[index])
+
+            out_feature.setGeometry(feature.geometry())
+            out_feature.setAttributes(attributes)
+            if not writer.addFeature(out_feature) and error is None:
+                error = f"{part_name}: {writer.errorMessage()}"
+            count += 1
+
+        # Deleting the writer flushes and closes the file
+        del writer
+
+        if feedback:
+            with lock:
+                progress["written"] += count
+                feedback.setProgress(100.0 * progress["written"] / total)
+        if error is not None:
+            return None, error
+        return (output_path, part_name), None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = [result for result in pool.map(write_part, sorted(clusters)) if result is not None]
+    finally:
+        providers.clear()
+
+    written_parts = [part for part, _ in results if part is not None]
+    errors = [error for _, error in results if error is not None]
+    return written_parts, errors
+
+
+def buffer_segments_for_tolerance(distance, max_deviation):
+    """Segments per quarter circle keeping every chord within max_deviation of the true arc.
+
+    A chord spanning the angle t deviates r * (1 - cos(t / 2)) from an arc
+    of radius r, so the largest allowed angle is 2 * acos(1 - e / r).
+    The result is clamped to BUFFER_MIN_SEGMENTS..BUFFER_MAX_SEGMENTS.
+    """
+    radius = abs(distance)
+    if max_deviation <= 0:
+        return BUFFER_MAX_SEGMENTS
+    if max_deviation >= radius:
+        return BUFFER_MIN_SEGMENTS
+
+    max_angle = 2 * math.acos(1 - max_deviation / radius)
+    segments = math.ceil((math.pi / 2) / max_angle)
+    return max(BUFFER_MIN_SEGMENTS, min(BUFFER_MAX_SEGMENTS, segments))
+
+
+def compare_buffer_segments(source, request, distance, segments, sample_size=BUFFER_SAMPLE_SIZE):
+    """Buffer a sample of features with BUFFER_SEGMENTS and with ``segments``.
+
+    Returns (sampled features, fixed_vertices, fixed_time, vertices, time)
+    for the sample, used to report what the adaptive segment count saves.
+    """
+    geometries = []
+    for feature in source.getFeatures(QgsFeatureRequest(request).setLimit(sample_size)):
+        if not feature.geometry().isEmpty():
+            geometries.append(feature.geometry())
+
+    results = []
+    for segment_count in (BUFFER_SEGMENTS, segments):
+        start = time.perf_counter()
+        vertices = 0
+        for geom in geometries:
+            buffered = geom.buffer(distance, segment_count, QgsGeometry.CapRound, QgsGeometry.JoinStyleRound, 2)
+            vertices += buffered.constGet().nCoordinates()
+        results.extend([vertices, time.perf_counter() - start])
+    return (len(geometries),) + tuple(results)
+
+
+def resident_memory_mb():
+    """Current resident memory of the QGIS process in MB, or None when it cannot be measured"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+class MemorySampler:
+    """Tracks the resident memory added while a block runs.
+
+    ru_maxrss only knows the peak of the whole QGIS session, so a thread
+    samples the current resident memory every MEMORY_SAMPLE_INTERVAL
+    seconds instead. ``peak_delta_mb`` is the highest sample above the
+    value at entry (None when memory cannot be measured); anything else
+    QGIS allocates meanwhile is counted too.
+    """
+
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        current = resident_memory_mb()
+        if current is not None and current > self.peak_mb:
+            self.peak_mb = current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start_mb = resident_memory_mb()
+        if self.start_mb is not None:
+            self.peak_mb = self.start_mb
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        return False
+
+    @property
+    def peak_delta_mb(self):
+        if self.start_mb is None:
+            return None
+        return self.peak_mb - self.start_mb
+
+
+def write_transformed_features(source, request, fields, wkb_type, crs, transform_context, output_path,
+                               transform_geometry, feedback=None, feature_count=-1):
+    """Stream features through ``transform_geometry`` into a new file.
+
+    Features are read one at a time (reprojected by ``request`` when it
+    carries a destination CRS), their geometry replaced by the multi type
+    of ``transform_geometry(geometry)`` (kept as is when it is None) and
+    written in WRITER_BATCH_SIZE batches, so no intermediate copy of the
+    layer is held in memory. ``feature_count`` (read from the layer on the
+    main thread) scales the progress. Returns the number of features written.
+    """
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = driver_for_path(output_path)
+    save_options.fileEncoding = "UTF-8"
+
+    writer = QgsVectorFileWriter.create(output_path, fields, wkb_type, crs, transform_context, save_options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Failed to create output:\n{writer.errorMessage()}")
+
+    total = max(1, feature_count)
+    written = 0
+    batch = []
+    for feature in source.getFeatures(request):
+        geom = feature.geometry()
+        if transform_geometry is not None and not geom.isEmpty():
+            geom = transform_geometry(geom)
+            geom.convertToMultiType()
+            feature.setGeometry(geom)
+        batch.append(feature)
+
+        if len(batch) >= WRITER_BATCH_SIZE:
+            writer.addFeatures(batch)
+            written += len(batch)
+            batch = []
+            if feedback:
+                if feedback.isCanceled():
+                    break
+                feedback.setProgress(100.0 * written / total)
+
+    if batch and not (feedback and feedback.isCanceled()):
+        writer.addFeatures(batch)
+        written += len(batch)
+
+    # Deleting the writer flushes and closes the file
+    del writer
+    return written
+
+
+def polygon_boundary(geom):
+    """Polygon rings as lines, the geometry part of native:polygonstolines"""
+    return QgsGeometry(geom.constGet().boundary())
+
+
+def _buffer_chunk(features, distance, segments):
+    """Buffer a list of features in place (runs in a worker thread)"""
+    for feature in features:
+        geom = feature.geometry()
+        if geom.isEmpty():
+            continue
+        # Round caps and joins, same style as the processing buffer
+        buffered = geom.buffer(distance, segments, QgsGeometry.CapRound, QgsGeometry.JoinStyleRound, 2)
+        buffered.convertToMultiType()
+        feature.setGeometry(buffered)
+    return features
+
+
+def buffer_features_parallel(source, request, fields, crs, transform_context, output_path,
+                             distance, segments, workers, feedback=None, feature_count=-1):
+    """Buffer the features of a source in chunks on a pool of worker threads.
+
+    The source is read sequentially in BUFFER_CHUNK_SIZE chunks (reprojected
+    by ``request`` when it carries a destination CRS), the chunks are
+    buffered in parallel and written back in submission order, so the
+    output keeps the feature order of the input. At most two chunks per
+    worker are in flight. ``feature_count`` (read from the layer on the
+    main thread, feature sources cannot count) scales the progress.
+    Returns the number of features written.
+    """
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = driver_for_path(output_path)
+    save_options.fileEncoding = "UTF-8"
+
+    writer = QgsVectorFileWriter.create(output_path, fields, QgsWkbTypes.MultiPolygon, crs,
+                                        transform_context, save_options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Failed to create buffer output:\n{writer.errorMessage()}")
+
+    total = max(1, feature_count)
+    written = 0
+    pending = []
+
+    def write_oldest(writer):
+        nonlocal written
+        chunk = pending.pop(0).result()
+        writer.addFeatures(chunk)
+        written += len(chunk)
+        if feedback:
+            feedback.setProgress(100.0 * written / total)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        chunk = []
+        for feature in source.getFeatures(request):
+            chunk.append(QgsFeature(feature))
+            if len(chunk) < BUFFER_CHUNK_SIZE:
+                continue
+
+            pending.append(pool.submit(_buffer_chunk, chunk, distance, segments))
+            chunk = []
+            if len(pending) >= 2 * workers:
+                write_oldest(writer)
+            if feedback and feedback.isCanceled():
+                break
+
+        if chunk and not (feedback and feedback.isCanceled()):
+            pending.append(pool.submit(_buffer_chunk, chunk, distance, segments))
+        while pending:
+            write_oldest(writer)
+
+    # Deleting the writer flushes and closes the file
+    del writer
+    return written
+
+
+def combine_fields(fields_a, fields_b):
+    """Fields of A followed by those of B, renaming clashes like QgsProcessingUtils.combineFields"""
+    fields = QgsFields(fields_a)
+    used_names = {field.name().lower() for field in fields_a}
+    names_b = {field.name().lower() for field in fields_b}
+    for field in fields_b:
+        new_field = QgsField(field)
+        if field.name().lower() in used_names:
+            suffix = 2
+            while (f"{field.name()}_{suffix}".lower() in used_names or
+                   f"{field.name()}_{suffix}".lower() in names_b):
+                suffix += 1
+            new_field.setName(f"{field.name()}_{suffix}")
+        fields.append(new_field)
+        used_names.add(new_field.name().lower())
+    return fields
+
+
+def _read_wkb_lines(np, wkb, offset, parts):
+    """Append the 2D vertex arrays of a (multi)linestring WKB to ``parts``, returns the end offset"""
+    byte_order = "<" if wkb[offset] == 1 else ">"
+    (wkb_type,) = struct.unpack_from(byte_order + "I", wkb, offset + 1)
+    offset += 5
+
+    # Both ISO (1000/2000/3000) and 25D flag style dimensions
+    has_z = bool(wkb_type & 0x80000000)
+    has_m = bool(wkb_type & 0x40000000)
+    wkb_type &= 0x0FFFFFFF
+    has_z = has_z or wkb_type // 1000 in (1, 3)
+    has_m = has_m or wkb_type // 1000 in (2, 3)
+    flat_type = wkb_type % 1000
+
+    if flat_type == 2:  # LineString
+        (count,) = struct.unpack_from(byte_order + "I", wkb, offset)
+        offset += 4
+        dims = 2 + has_z + has_m
+        vertices = np.frombuffer(wkb, dtype=byte_order + "f8", count=count * dims, offset=offset)
+        parts.append(vertices.reshape(count, dims)[:, :2])
+        return offset + 8 * count * dims
+
+    if flat_type in (5, 7):  # MultiLineString, GeometryCollection
+        (count,) = struct.unpack_from(byte_order + "I", wkb, offset)
+        offset += 4
+        for _ in range(count):
+            offset = _read_wkb_lines(np, wkb, offset, parts)
+        return offset
+
+    raise ValueError(f"Unsupported geometry type in line layer (WKB type {wkb_type})")
+
+
+def extract_line_segments(source, request, feedback=None, feature_count=-1):
+    """Decompose the lines of a source into a segment array.
+
+    Returns (segments, owners, feature_ids, attributes): an (n, 4) array of
+    x1, y1, x2, y2 rows, the index of the feature each segment belongs to,
+    and the id and attributes of every feature read. Vertices are taken
+    straight from the WKB, curves are segmentized first. ``feature_count``
+    (read from the layer on the main thread) scales the progress.
+    """
+    import numpy as np
+
+    segment_blocks = []
+    owner_blocks = []
+    feature_ids = []
+    attributes = []
+    total = max(1, feature_count)
+
+    for feature in source.getFeatures(request):
+        geom = feature.geometry()
+        if geom.isEmpty():
+            continue
+        if QgsWkbTypes.isCurvedType(geom.wkbType()):
+            geom = QgsGeometry(geom.constGet().segmentize())
+
+        parts = []
+        _read_wkb_lines(np, bytes(geom.asWkb()), 0, parts)
+        feature_index = len(feature_ids)
+        for vertices in parts:
+            if len(vertices) < 2:
+                continue
+            segment_blocks.append(np.hstack((vertices[:-1], vertices[1:])))
+            owner_blocks.append(np.full(len(vertices) - 1, feature_index, dtype=np.int64))
+
+        feature_ids.append(feature.id())
+        attributes.append(feature.attributes())
+
+        if feedback and len(feature_ids) % 10000 == 0:
+            if feedback.isCanceled():
+                break
+            feedback.setProgress(100.0 * len(feature_ids) / total)
+
+    if not segment_blocks:
+        return np.empty((0, 4)), np.empty(0, dtype=np.int64), feature_ids, attributes
+    return np.vstack(segment_blocks), np.concatenate(owner_blocks), feature_ids, attributes
+
+
+def _segment_bounds(segments):
+    """xmin, ymin, xmax, ymax columns of a segment array"""
+    import numpy as np
+    return (np.minimum(segments[:, 0], segments[:, 2]), np.minimum(segments[:, 1], segments[:, 3]),
+            np.maximum(segments[:, 0], segments[:, 2]), np.maximum(segments[:, 1], segments[:, 3]))
+
+
+def _expand_ranges(starts, counts):
+    """Concatenation of the integer ranges [start, start + count)"""
+    import numpy as np
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+
+class SegmentGrid:
+    """Grid bucket index over a segment array.
+
+    Every segment is registered in each cell its bounding box touches. The
+    cell size follows the typical segment extent, segments spanning more
+    than SEGMENT_GRID_MAX_CELLS cells are kept aside and matched by a
+    bounding box scan instead, so a few long lines cannot blow up the index.
+    """
+
+    def __init__(self, segments, cell_size, origin):
+        import numpy as np
+
+        self.segments = segments
+        self.cell_size = cell_size
+        self.origin = origin
+        self.bounds = _segment_bounds(segments)
+
+        cell_x0, cell_y0, cell_x1, cell_y1 = self.cell_ranges(self.bounds)
+        widths = cell_x1 - cell_x0 + 1
+        counts = widths * (cell_y1 - cell_y0 + 1)
+        oversized = counts > SEGMENT_GRID_MAX_CELLS
+        self.oversized = np.nonzero(oversized)[0]
+
+        counts = np.where(oversized, 0, counts)
+        segment_index = np.repeat(np.arange(len(segments)), counts)
+        local = _expand_ranges(np.zeros(len(segments), dtype=np.int64), counts)
+        cell_x = cell_x0[segment_index] + local % widths[segment_index]
+        cell_y = cell_y0[segment_index] + local // widths[segment_index]
+        keys = self.cell_keys(cell_x, cell_y)
+
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.entries = segment_index[order]
+
+    def cell_ranges(self, bounds):
+        """First and last cell column/row touched by each bounding box"""
+        import numpy as np
+        xmin, ymin, xmax, ymax = bounds
+        return (np.floor((xmin - self.origin[0]) / self.cell_size).astype(np.int64),
+                np.floor((ymin - self.origin[1]) / self.cell_size).astype(np.int64),
+                np.floor((xmax - self.origin[0]) / self.cell_size).astype(np.int64),
+                np.floor((ymax - self.origin[1]) / self.cell_size).astype(np.int64))
+
+    @staticmethod
+    def cell_keys(cell_x, cell_y):
+        """Single sortable key per cell, the grid never exceeds 4096 cells per axis"""
+        return (cell_y << 32) + cell_x
+
+    def candidate_pairs(self, segments):
+        """Unique (query index, indexed segment) pairs whose bounding boxes overlap"""
+        import numpy as np
+
+        bounds = _segment_bounds(segments)
+        cell_x0, cell_y0, cell_x1, cell_y1 = self.cell_ranges(bounds)
+        widths = cell_x1 - cell_x0 + 1
+        counts = widths * (cell_y1 - cell_y0 + 1)
+        long_queries = np.nonzero(counts > SEGMENT_GRID_MAX_CELLS)[0]
+        counts[long_queries] = 0
+
+        query_index = np.repeat(np.arange(len(segments)), counts)
+        local = _expand_ranges(np.zeros(len(segments), dtype=np.int64), counts)
+        cell_x = cell_x0[query_index] + local % widths[query_index]
+        cell_y = cell_y0[query_index] + local // widths[query_index]
+        keys = self.cell_keys(cell_x, cell_y)
+
+        low = np.searchsorted(self.keys, keys, side="left")
+        high = np.searchsorted(self.keys, keys, side="right")
+        matches = high - low
+        pair_query = [np.repeat(query_index, matches)]
+        pair_indexed = [self.entries[_expand_ranges(low, matches)]]
+
+        # Segments too long for the grid are matched by scanning bounding boxes
+        for query in long_queries:
+            hits = np.nonzero(_bounds_overlap(self.bounds, [bound[query] for bound in bounds]))[0]
+            pair_query.append(np.full(len(hits), query, dtype=np.int64))
+            pair_indexed.append(hits)
+        for indexed in self.oversized:
+            hits = np.nonzero(_bounds_overlap(bounds, [bound[indexed] for bound in self.bounds]))[0]
+            pair_query.append(hits)
+            pair_indexed.append(np.full(len(hits), indexed, dtype=np.int64))
+        pair_query = np.concatenate(pair_query)
+        pair_indexed = np.concatenate(pair_indexed)
+
+        # Exact bounding box test, then drop pairs found through several cells
+        overlap = _bounds_overlap([bound[pair_indexed] for bound in self.bounds],
+                                  [bound[pair_query] for bound in bounds])
+        codes = np.unique(pair_query[overlap] * len(self.segments) + pair_indexed[overlap])
+        return codes // len(self.segments), codes % len(self.segments)
+
+
+def _bounds_overlap(bounds_a, bounds_b):
+    """Element-wise (or broadcast) bounding box overlap test, touching counts as overlap"""
+    return ((bounds_a[0] <= bounds_b[2]) & (bounds_b[0] <= bounds_a[2]) &
+            (bounds_a[1] <= bounds_b[3]) & (bounds_b[1] <= bounds_a[3]))
+
+
+def _intersect_segment_pairs(np, segments_a, segments_b):
+    """Intersection points and collinear overlaps of paired segments.
+
+    Returns (points, overlaps). ``points`` is (pair index, x, y, t, u) for
+    the pairs that cross or touch, t and u being the position of the point
+    along segment a and b. Collinear pairs meeting at a single point give
+    that point, those sharing a stretch give no point but an entry
+    (pair index, x1, y1, x2, y2) in ``overlaps``: GEOS returns a line
+    there, which native:lineintersections does not turn into points.
+    """
+    x1, y1, x2, y2 = segments_a.T
+    x3, y3, x4, y4 = segments_b.T
+    dx_a = x2 - x1
+    dy_a = y2 - y1
+    dx_b = x4 - x3
+    dy_b = y4 - y3
+
+    denominator = dx_a * dy_b - dy_a * dx_b
+    parallel = np.abs(denominator) <= 1e-12 * (np.abs(dx_a * dy_b) + np.abs(dy_a * dx_b) + 1e-300)
+    safe = np.where(parallel, 1.0, denominator)
+    t = ((x3 - x1) * dy_b - (y3 - y1) * dx_b) / safe
+    u = ((x3 - x1) * dy_a - (y3 - y1) * dx_a) / safe
+
+    epsilon = SEGMENT_PARAMETER_EPSILON
+    crossing = np.nonzero((~parallel) & (t >= -epsilon) & (t <= 1 + epsilon) &
+                          (u >= -epsilon) & (u <= 1 + epsilon))[0]
+    t_crossing = np.clip(t[crossing], 0.0, 1.0)
+    u_crossing = np.clip(u[crossing], 0.0, 1.0)
+
+    # Collinear pairs: position of the ends of b along a
+    length_sq_a = dx_a * dx_a + dy_a * dy_a
+    offset = (x3 - x1) * dy_a - (y3 - y1) * dx_a
+    collinear = np.nonzero(parallel & (length_sq_a > 0) & ((dx_b != 0) | (dy_b != 0)) &
+                           (offset * offset <= INTERSECTION_TOLERANCE ** 2 * length_sq_a))[0]
+    length_sq = length_sq_a[collinear]
+    t3 = ((x3 - x1) * dx_a + (y3 - y1) * dy_a)[collinear] / length_sq
+    t4 = ((x4 - x1) * dx_a + (y4 - y1) * dy_a)[collinear] / length_sq
+    low = np.maximum(np.minimum(t3, t4), 0.0)
+    high = np.minimum(np.maximum(t3, t4), 1.0)
+    shared = (high - low) * np.sqrt(length_sq)
+
+    touch = np.abs(shared) <= INTERSECTION_TOLERANCE
+    t_touch = np.clip((low[touch] + high[touch]) / 2, 0.0, 1.0)
+    u_touch = np.clip((t_touch - t3[touch]) / (t4[touch] - t3[touch]), 0.0, 1.0)
+
+    index = np.concatenate((crossing, collinear[touch]))
+    t_points = np.concatenate((t_crossing, t_touch))
+    points = (index, x1[index] + t_points * dx_a[index], y1[index] + t_points * dy_a[index],
+              t_points, np.concatenate((u_crossing, u_touch)))
+
+    overlap = shared > INTERSECTION_TOLERANCE
+    overlap_index = collinear[overlap]
+    overlaps = (overlap_index,
+                x1[overlap_index] + low[overlap] * dx_a[overlap_index],
+                y1[overlap_index] + low[overlap] * dy_a[overlap_index],
+                x1[overlap_index] + high[overlap] * dx_a[overlap_index],
+                y1[overlap_index] + high[overlap] * dy_a[overlap_index])
+    return points, overlaps
+
+
+def _part_end_flags(np, segments, owners):
+    """Flags of the segments starting and ending a line part.
+
+    Segments of a part are consecutive, a part starts where the previous
+    segment belongs to another feature or does not end at this segment's
+    start. Parts of one feature joined end to end count as a single line.
+    """
+    starts = np.ones(len(segments), dtype=bool)
+    starts[1:] = ((owners[1:] != owners[:-1]) | (segments[1:, 0] != segments[:-1, 2]) |
+                  (segments[1:, 1] != segments[:-1, 3]))
+    ends = np.ones(len(segments), dtype=bool)
+    ends[:-1] = starts[1:]
+    return starts, ends
+
+
+def _points_on_overlaps(np, owner_a, owner_b, x, y, overlaps):
+    """Mask of the points lying on a collinear overlap of their own feature pair"""
+    overlap_a, overlap_b, ox1, oy1, ox2, oy2 = overlaps
+    on_overlap = np.zeros(len(x), dtype=bool)
+    if not len(overlap_a) or not len(x):
+        return on_overlap
+
+    base = int(max(owner_b.max(), overlap_b.max())) + 1
+    overlap_codes = overlap_a * base + overlap_b
+    order = np.argsort(overlap_codes, kind="stable")
+    overlap_codes = overlap_codes[order]
+    point_codes = owner_a * base + owner_b
+    low = np.searchsorted(overlap_codes, point_codes, side="left")
+    counts = np.searchsorted(overlap_codes, point_codes, side="right") - low
+
+    point_index = np.repeat(np.arange(len(x)), counts)
+    overlap_index = order[_expand_ranges(low, counts)]
+    dx = ox2[overlap_index] - ox1[overlap_index]
+    dy = oy2[overlap_index] - oy1[overlap_index]
+    px = x[point_index] - ox1[overlap_index]
+    py = y[point_index] - oy1[overlap_index]
+    t = np.clip((px * dx + py * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+    distance_sq = (px - t * dx) ** 2 + (py - t * dy) ** 2
+    on_overlap[point_index[distance_sq <= INTERSECTION_TOLERANCE ** 2]] = True
+    return on_overlap
+
+
+def segment_intersections(segments_a, owners_a, segments_b, owners_b, workers=1, feedback=None,
+                          same_layer=False, endpoint_touches=True):
+    """Intersection points between two segment arrays.
+
+    Segments of B are put in a SegmentGrid, segments of A are queried in
+    SEGMENT_BATCH_SIZE batches spread over ``workers`` threads and every
+    candidate pair is solved in one vectorized step. Points are reported
+    once per feature pair (owner_a, owner_b), points closer than
+    INTERSECTION_TOLERANCE collapsing into one. Where two features share
+    a stretch, points on it (such as the ends of the stretch) are dropped
+    like native:lineintersections does. With ``same_layer`` both arrays
+    are the same layer and only pairs with owner_a < owner_b are kept, so
+    each crossing between two features is reported once. Without
+    ``endpoint_touches`` points at the start or end of a line part (a line
+    ending on another, two lines meeting end to end) are left out.
+
+    Returns (owner_a, owner_b, x, y) arrays sorted by feature pair, or
+    None when cancelled.
+    """
+    import numpy as np
+
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+    if not len(segments_a) or not len(segments_b):
+        return empty
+
+    # Cell size from the typical segment extent, at least 1/4096 of the data extent
+    extent_a = np.maximum(np.abs(segments_a[:, 2] - segments_a[:, 0]), np.abs(segments_a[:, 3] - segments_a[:, 1]))
+    extent_b = np.maximum(np.abs(segments_b[:, 2] - segments_b[:, 0]), np.abs(segments_b[:, 3] - segments_b[:, 1]))
+    bounds_b = _segment_bounds(segments_b)
+    span = max(bounds_b[2].max() - bounds_b[0].min(), bounds_b[3].max() - bounds_b[1].min())
+    cell_size = max(float(np.percentile(np.concatenate((extent_a, extent_b)), 90)), span / 4096.0, 1e-9)
+    grid = SegmentGrid(segments_b, cell_size, (bounds_b[0].min(), bounds_b[1].min()))
+    if not endpoint_touches:
+        starts_a, ends_a = _part_end_flags(np, segments_a, owners_a)
+        starts_b, ends_b = _part_end_flags(np, segments_b, owners_b)
+
+    batches = range(0, len(segments_a), SEGMENT_BATCH_SIZE)
+    done = {"count": 0}
+    lock = threading.Lock()
+
+    def intersect_batch(start):
+        if feedback and feedback.isCanceled():
+            return None
+        batch = segments_a[start:start + SEGMENT_BATCH_SIZE]
+        query, indexed = grid.candidate_pairs(batch)
+        pair_a = owners_a[start + query]
+        pair_b = owners_b[indexed]
+
+        keep = pair_a < pair_b if same_layer else np.ones(len(query), dtype=bool)
+        pair_a = pair_a[keep]
+        pair_b = pair_b[keep]
+        points, overlaps = _intersect_segment_pairs(np, batch[query[keep]], segments_b[indexed[keep]])
+
+        if not endpoint_touches:
+            pair_index, t, u = points[0], points[3], points[4]
+            segment_a = start + query[keep][pair_index]
+            segment_b = indexed[keep][pair_index]
+            epsilon = SEGMENT_PARAMETER_EPSILON
+            touch = (((t <= epsilon) & starts_a[segment_a]) | ((t >= 1 - epsilon) & ends_a[segment_a]) |
+                     ((u <= epsilon) & starts_b[segment_b]) | ((u >= 1 - epsilon) & ends_b[segment_b]))
+            points = tuple(column[~touch] for column in points)
+
+        if feedback:
+            with lock:
+                done["count"] += 1
+                feedback.setProgress(100.0 * done["count"] / len(batches))
+        point_pairs = points[0]
+        overlap_pairs = overlaps[0]
+        return ((pair_a[point_pairs], pair_b[point_pairs], points[1], points[2]),
+                (pair_a[overlap_pairs], pair_b[overlap_pairs]) + overlaps[1:])
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(intersect_batch, batches))
+    if feedback and feedback.isCanceled():
+        return None
+
+    owner_a, owner_b, x, y = (np.concatenate([result[0][column] for result in results]) for column in range(4))
+    if not len(x):
+        return empty
+    overlaps = tuple(np.concatenate([result[1][column] for result in results]) for column in range(6))
+
+    # A crossing at a shared vertex is found once per adjacent segment, keep one point per location
+    snapped = np.column_stack((owner_a, owner_b,
+                               np.round(x / INTERSECTION_TOLERANCE).astype(np.int64),
+                               np.round(y / INTERSECTION_TOLERANCE).astype(np.int64)))
+    _, first = np.unique(snapped, axis=0, return_index=True)
+    owner_a, owner_b, x, y = owner_a[first], owner_b[first], x[first], y[first]
+
+    # Points where a shared stretch starts or ends belong to the overlap, not to a crossing
+    keep = ~_points_on_overlaps(np, owner_a, owner_b, x, y, overlaps)
+    return owner_a[keep], owner_b[keep], x[keep], y[keep]
+
+
+def write_intersection_points(owner_a, owner_b, x, y, fields, make_attributes, crs, transform_context,
+                              output_path, feedback=None):
+    """Write intersection points with ``make_attributes(owner_a, owner_b)`` as their attributes"""
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = driver_for_path(output_path)
+    save_options.fileEncoding = "UTF-8"
+
+    writer = QgsVectorFileWriter.create(output_path, fields, QgsWkbTypes.Point, crs, transform_context, save_options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Failed to create intersection output:\n{writer.errorMessage()}")
+
+    batch = []
+    for index in range(len(x)):
+        feature = QgsFeature(fields)
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(float(x[index]), float(y[index]))))
+        feature.setAttributes(make_attributes(int(owner_a[index]), int(owner_b[index])))
+        batch.append(feature)
+
+        if len(batch) >= WRITER_BATCH_SIZE:
+            writer.addFeatures(batch)
+            batch = []
+            if feedback and feedback.isCanceled():
+                break
+    if batch:
+        writer.addFeatures(batch)
+
+    # Deleting the writer flushes and closes the file
+    del writer
+    return len(x)
+
+
+def line_intersections(source_a, source_b, request, fields, crs, transform_context, output_path,
+                       workers, feedback=None, feature_counts=(-1, -1)):
+    """Native counterpart of native:lineintersections with all fields of both layers.
+
+    Both sources are read through ``request`` (which reprojects them to the
+    output CRS), decomposed into segments and intersected with
+    segment_intersections(). ``feature_counts`` are the feature counts of
+    both layers, for the progress. Returns the number of points written.
+    """
+    segments_a, owners_a, _, attributes_a = extract_line_segments(source_a, request, feedback, feature_counts[0])
+    segments_b, owners_b, _, attributes_b = extract_line_segments(source_b, request, feedback, feature_counts[1])
+    if feedback and feedback.isCanceled():
+        return 0
+
+    result = segment_intersections(segments_a, owners_a, segments_b, owners_b, workers, feedback)
+    if result is None:
+        return 0
+
+    return write_intersection_points(*result, fields,
+                                     lambda index_a, index_b: attributes_a[index_a] + attributes_b[index_b],
+                                     crs, transform_context, output_path, feedback)
+
+
+def crossing_output_fields():
+    """Fields of a self crossing layer: the two line ids plus the QC bridge fields"""
+    fields = QgsFields()
+    fields.append(QgsField("FID_A", QVariant.LongLong))
+    fields.append(QgsField("FID_B", QVariant.LongLong))
+    fields.append(QgsField("QC", QVariant.String))
+    fields.append(QgsField("QCRemarks", QVariant.String))
+    return fields
+
+
+def line_crossings(source, request, crs, transform_context, output_path, workers, feedback=None,
+                   include_touches=False, feature_count=-1):
+    """Points where different lines of one layer cross.
+
+    Each crossing between two features is written once, with the feature
+    ids as FID_A < FID_B and empty QC fields so the points can be worked
+    through with the QC status buttons. Shared stretches give no points
+    and, unless ``include_touches``, neither do lines ending on another
+    line or meeting end to end, as seamlines normally do. ``feature_count``
+    is the layer's feature count, for the progress. Returns the number of
+    points.
+    """
+    segments, owners, feature_ids, _ = extract_line_segments(source, request, feedback, feature_count)
+    if feedback and feedback.isCanceled():
+        return 0
+
+    result = segment_intersections(segments, owners, segments, owners, workers, feedback, same_layer=True,
+                                   endpoint_touches=include_touches)
+    if result is None:
+        return 0
+
+    def make_attributes(index_a, index_b):
+        fid_a, fid_b = sorted((feature_ids[index_a], feature_ids[index_b]))
+        return [fid_a, fid_b, None, None]
+
+    return write_intersection_points(*result, crossing_output_fields(), make_attributes,
+                                     crs, transform_context, output_path, feedback)
+
+
+def _merge_string_value(value):
+    """Value of a field whose type differs between merged layers, NULL stays NULL"""
+    return None if value is None or value == NULL else str(value)
+
+
+def merge_output_fields(field_sets):
+    """Union of the fields of all merged layers plus the layer and path columns.
+
+    Fields are matched by name case-insensitively, like
+    native:mergevectorlayers; a name used with different types becomes a
+    string field. The GeoPackage fid column of the inputs is left out: the
+    writer would take it as the output primary key, where the ids of
+    different inputs collide.
+    """
+    merged = []
+    index_of = {}
+    for source_fields in field_sets:
+        for field in source_fields:
+            key = field.name().lower()
+            if key == "fid":
+                continue
+            if key not in index_of:
+                index_of[key] = len(merged)
+                merged.append(QgsField(field))
+            elif merged[index_of[key]].type() != field.type():
+                merged[index_of[key]] = QgsField(merged[index_of[key]].name(), QVariant.String)
+
+    for extra in ("layer", "path"):
+        if extra not in index_of:
+            merged.append(QgsField(extra, QVariant.String))
+
+    fields = QgsFields()
+    for field in merged:
+        fields.append(field)
+    return fields
+
+
+def merge_output_wkb_type(wkb_types):
+    """Multi geometry type covering all inputs, with Z or M when any input has them"""
+    wkb_type = QgsWkbTypes.multiType(QgsWkbTypes.flatType(wkb_types[0]))
+    if any(QgsWkbTypes.hasZ(input_type) for input_type in wkb_types):
+        wkb_type = QgsWkbTypes.addZ(wkb_type)
+    if any(QgsWkbTypes.hasM(input_type) for input_type in wkb_types):
+        wkb_type = QgsWkbTypes.addM(wkb_type)
+    return wkb_type
+
+
+def merge_feature_batches(source, source_fields, request, fields, wkb_type, layer_name, layer_path):
+    """Yield one merged input as batches of output features.
+
+    The attribute mapping onto the union schema is compiled once (fields
+    left out of it are skipped), each geometry is made multi and given the
+    Z/M dimensions of the output.
+    """
+    plan = []
+    for source_index, field in enumerate(source_fields):
+        target_index = fields.lookupField(field.name())
+        if target_index == -1:
+            continue
+        converter = _merge_string_value if fields.at(target_index).type() != field.type() else None
+        plan.append((source_index, target_index, converter))
+    layer_index = fields.lookupField("layer")
+    path_index = fields.lookupField("path")
+    add_z = QgsWkbTypes.hasZ(wkb_type)
+    add_m = QgsWkbTypes.hasM(wkb_type)
+
+    batch = []
+    for feature in source.getFeatures(request):
+        source_attributes = feature.attributes()
+        attributes = [None] * fields.count()
+        for source_index, target_index, converter in plan:
+            value = source_attributes[source_index]
+            attributes[target_index] = converter(value) if converter else value
+        attributes[layer_index] = layer_name
+        attributes[path_index] = layer_path
+
+        out_feature = QgsFeature(fields)
+        geom = feature.geometry()
+        if not geom.isEmpty():
+            geom.convertToMultiType()
+            if add_z and not QgsWkbTypes.hasZ(geom.wkbType()):
+                geom.get().addZValue(0)
+            if add_m and not QgsWkbTypes.hasM(geom.wkbType()):
+                geom.get().addMValue(0)
+            out_feature.setGeometry(geom)
+        out_feature.setAttributes(attributes)
+        batch.append(out_feature)
+
+        if len(batch) >= WRITER_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _read_merge_inputs_parallel(inputs, fields, wkb_type, workers, stop):
+    """Yield the feature batches of all inputs, read ahead by a pool of reader threads.
+
+    Every input gets its own bounded queue of MERGE_QUEUE_BATCHES batches
+    and the queues are drained in input order, so the output order matches
+    a serial merge and at most that many batches per started reader are
+    held in memory. Setting ``stop`` makes the readers give up.
+    """
+    queues = [queue.Queue(maxsize=MERGE_QUEUE_BATCHES) for _ in inputs]
+
+    def put(input_queue, item):
+        # Wake up regularly so a stopped merge does not leave readers blocked
+        while not stop.is_set():
+            try:
+                input_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(index):
+        if stop.is_set():
+            return
+        source, source_fields, request, layer_name, layer_path, _ = inputs[index]
+        try:
+            for batch in merge_feature_batches(source, source_fields, request, fields, wkb_type,
+                                               layer_name, layer_path):
+                if not put(queues[index], batch):
+                    return
+        except Exception as e:
+            put(queues[index], e)
+            return
+        put(queues[index], None)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for index in range(len(inputs)):
+            pool.submit(read, index)
+        try:
+            for input_queue in queues:
+                while True:
+                    item = input_queue.get()
+                    if item is None:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+        finally:
+            stop.set()
+
+
+def merge_layers_streaming(inputs, fields, wkb_type, crs, transform_context, output_path, workers=1,
+                           feedback=None):
+    """Stream every input in turn into one GeoPackage or FlatGeobuf file.
+
+    ``inputs`` holds (source, source_fields, request, layer_name,
+    layer_path, feature_count) tuples; the request reprojects a layer only
+    when it is not already in the output CRS and the count is only used
+    for the progress. With more than one worker the inputs are
+    read and reprojected in parallel by _read_merge_inputs_parallel(). A
+    single writer is used either way, which the GPKG driver wraps in one
+    transaction. Returns the number of features written.
+    """
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = driver_for_path(output_path)
+    save_options.fileEncoding = "UTF-8"
+
+    writer = QgsVectorFileWriter.create(output_path, fields, wkb_type, crs, transform_context, save_options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Failed to create merged output:\n{writer.errorMessage()}")
+
+    if workers > 1:
+        stop = threading.Event()
+        batches = _read_merge_inputs_parallel(inputs, fields, wkb_type, workers, stop)
+    else:
+        batches = (batch
+                   for source, source_fields, request, layer_name, layer_path, _ in inputs
+                   for batch in merge_feature_batches(source, source_fields, request, fields, wkb_type,
+                                                      layer_name, layer_path))
+
+    total = max(1, sum(max(0, feature_count) for *_, feature_count in inputs))
+    written = 0
+    try:
+        for batch in batches:
+            writer.addFeatures(batch)
+            written += len(batch)
+            if feedback:
+                if feedback.isCanceled():
+                    break
+                feedback.setProgress(100.0 * written / total)
+    finally:
+        # Stops the readers of a cancelled or failed parallel merge
+        batches.close()
+
+    # Deleting the writer commits the transaction and closes the file
+    del writer
+    return written
+
+
+def write_selected_features(source, feature_ids, fields, wkb_type, crs, transform_context, output_path,
+                            feedback=None):
+    """Write features of a source, given by id, to a new file.
+
+    The ids are fetched SELECTION_PAGE_SIZE at a time, in id order, and
+    each page goes to the writer in one addFeatures call, so only one page
+    of features is held in memory however large the selection is. The
+    driver follows the output extension. Returns the number written.
+    """
+    save_options = QgsVectorFileWriter.SaveVectorOptions()
+    save_options.driverName = driver_for_path(output_path)
+    save_options.fileEncoding = "UTF-8"
+
+    writer = QgsVectorFileWriter.create(output_path, fields, wkb_type, crs, transform_context, save_options)
+    if writer.hasError() != QgsVectorFileWriter.NoError:
+        raise RuntimeError(f"Failed to save features:\n{writer.errorMessage()}")
+
+    feature_ids = sorted(feature_ids)
+    written = 0
+    for start in range(0, len(feature_ids), SELECTION_PAGE_SIZE):
+        request = QgsFeatureRequest().setFilterFids(feature_ids[start:start + SELECTION_PAGE_SIZE])
+        page = list(source.getFeatures(request))
+        writer.addFeatures(page)
+        written += len(page)
+
+        if feedback:
+            if feedback.isCanceled():
+                break
+            feedback.setProgress(100.0 * written / max(1, len(feature_ids)))
+
+    # Deleting the writer flushes and closes the file
+    del writer
+    return written
+
+
+class GeoPackageDeliverable:
+    """A GeoPackage that exported selections are appended to, one table per name.
+
+    Table providers are opened once and stay open across exports, each
+    page of features goes to the provider in one addFeatures call, which
+    the OGR provider commits as a single transaction. Exports may run in
+    several tasks at once, so every write holds the lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.providers = {}
+
+    def close(self):
+        """Release the open table providers"""
+        with self.lock:
+            self.providers.clear()
+
+    def _table_names(self):
+        """Lower case names of the tables already in the GeoPackage, raises when it cannot be read"""
+        if not os.path.exists(self.path):
+            return set()
+
+        provider = QgsProviderRegistry.instance().createProvider("ogr", self.path, QgsDataProvider.ProviderOptions())
+        if provider is None or not provider.isValid():
+            raise RuntimeError(f"Could not read the tables of {self.path}")
+
+        try:
+            separator = QgsDataProvider.sublayerSeparator()
+        except AttributeError:
+            # QGIS < 3.12
+            separator = ":"
+        # Sublayer entries are "index<sep>name<sep>feature count<sep>..."
+        names = set()
+        for sublayer in provider.subLayers():
+            parts = sublayer.split(separator)
+            if len(parts) > 1:
+                names.add(parts[1].lower())
+        return names
+
+    def _table_provider(self, table, fields, wkb_type, crs, transform_context):
+        """Open provider of a table, creating the table (and file) on first use.
+
+        The table is only created when the GeoPackage does not list it, any
+        other failure to open it raises instead of overwriting the table.
+        """
+        provider = self.providers.get(table)
+        if provider is not None:
+            return provider
+
+        uri = f"{self.path}|layername={table}"
+        options = QgsDataProvider.ProviderOptions()
+        if table.lower() in self._table_names():
+            provider = QgsProviderRegistry.instance().createProvider("ogr", uri, options)
+            if provider is None or not provider.isValid():
+                raise RuntimeError(f"Could not open table {table} in {self.path}")
+        else:
+            save_options = QgsVectorFileWriter.SaveVectorOptions()
+            save_options.driverName = "GPKG"
+            save_options.layerName = table
+            save_options.fileEncoding = "UTF-8"
+            if os.path.exists(self.path):
+                save_options.actionOnExistingFile = QgsVectorFileWriter.CreateOrOverwriteLayer
+            writer = QgsVectorFileWriter.create(self.path, fields, wkb_type, crs, transform_context, save_options)
+            if writer.hasError() != QgsVectorFileWriter.NoError:
+                raise RuntimeError(f"Failed to create table {table}:\n{writer.errorMessage()}")
+            del writer
+
+            provider = QgsProviderRegistry.instance().createProvider("ogr", uri, options)
+            if provider is None or not provider.isValid():
+                raise RuntimeError(f"Could not open table {table} in {self.path}")
+
+        self.providers[table] = provider
+        return provider
+
+    def append(self, table, source, feature_ids, fields, wkb_type, crs, transform_context, feedback=None):
+        """Append features of a source, given by id, to a table. Returns the number written.
+
+        Attributes are matched to the table columns by name (missing ones
+        stay NULL, the fid column is left to the table), geometries are
+        reprojected to the table CRS when it differs.
+        """
+        with self.lock:
+            provider = self._table_provider(table, fields, wkb_type, crs, transform_context)
+            target_fields = provider.fields()
+            fid_index = target_fields.lookupField("fid")
+            mapping = [(source_index, target_fields.lookupField(field.name()))
+                       for source_index, field in enumerate(fields)]
+            mapping = [(source_index, target_index) for source_index, target_index in mapping
+                       if target_index not in (-1, fid_index)]
+            make_multi = QgsWkbTypes.isMultiType(provider.wkbType())
+
+            request = QgsFeatureRequest()
+            if provider.crs() != crs:
+                request.setDestinationCrs(provider.crs(), transform_context)
+
+            feature_ids = sorted(feature_ids)
+            written = 0
+            for start in range(0, len(feature_ids), SELECTION_PAGE_SIZE):
+                request.setFilterFids(feature_ids[start:start + SELECTION_PAGE_SIZE])
+                page = []
+                for feature in source.getFeatures(request):
+                    source_attributes = feature.attributes()
+                    attributes = [None] * target_fields.count()
+                    for source_index, target_index in mapping:
+                        attributes[target_index] = source_attributes[source_index]
+
+                    out_feature = QgsFeature(target_fields)
+                    geom = feature.geometry()
+                    if make_multi and not geom.isEmpty():
+                        geom.convertToMultiType()
+                    out_feature.setGeometry(geom)
+                    out_feature.setAttributes(attributes)
+                    page.append(out_feature)
+
+                if not provider.addFeatures(page)[0]:
+                    raise RuntimeError(f"Failed to append to {table}: {provider.error().message()}")
+                written += len(page)
+
+                if feedback:
+                    if feedback.isCanceled():
+                        break
+                    feedback.setProgress(100.0 * written / max(1, len(feature_ids)))
+            return written
+
+
+def is_cached_field(field_name):
+    """True for the Bridge/Seamline fields kept in a LayerAttributeCache"""
+    return field_name in CACHED_FIELDS or field_name.startswith("Geo_")
+
+
+def _cache_value(value):
+    """Attribute value as stored in the cache, NULL becomes None"""
+    return None if value is None or value == NULL else value
+
+
+class LayerAttributeCache:
+    """Columnar copy of the Bridge/Seamline fields of one layer.
+
+    Every cached field is a NumPy array of category codes (-1 for NULL)
+    with the distinct values kept once, rows are mapped to feature ids.
+    The cache is filled by one attribute-only scan and then follows the
+    layer's edit signals. Schema changes, rollbacks, commits that add
+    features (which renumber them) and provider reloads only mark it
+    stale, the next ensure() rescans. Changes written straight to the
+    provider bypass the signals and must be reported with set_values(),
+    writes by other programs are only seen after a reload. The cache is
+    for counting and selecting only, it never decides which writes happen.
+
+    Listeners (see QcProgressCounts) are told about every row change with
+    the previous code, and reset() when the cache goes stale.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.valid = False
+        self.field_names = []
+        self.field_of_index = {}
+        self.row_of = {}
+        self.size = 0
+        self.fids = None
+        self.alive = None
+        self.codes = {}
+        self.categories = {}
+        self.code_of = {}
+        self.listeners = []
+        self._reloading = False
+
+        # The provider reports reloads (layer.reload(), the refresh button, data source changes)
+        self.provider = layer.dataProvider()
+        self.provider.dataChanged.connect(self._provider_data_changed)
+        layer.attributeValueChanged.connect(self._attribute_value_changed)
+        layer.featureAdded.connect(self._feature_added)
+        layer.featureDeleted.connect(self._feature_deleted)
+        layer.updatedFields.connect(self.invalidate)
+        layer.afterRollBack.connect(self.invalidate)
+        layer.committedFeaturesAdded.connect(self.invalidate)
+
+    def disconnect(self):
+        """Stop following the layer, used before the layer goes away"""
+        self.provider.dataChanged.disconnect(self._provider_data_changed)
+        self.layer.attributeValueChanged.disconnect(self._attribute_value_changed)
+        self.layer.featureAdded.disconnect(self._feature_added)
+        self.layer.featureDeleted.disconnect(self._feature_deleted)
+        self.layer.updatedFields.disconnect(self.invalidate)
+        self.layer.afterRollBack.disconnect(self.invalidate)
+        self.layer.committedFeaturesAdded.disconnect(self.invalidate)
+
+    def invalidate(self, *args):
+        self.valid = False
+        for listener in self.listeners:
+            listener.reset()
+
+    def _provider_data_changed(self):
+        if not self._reloading:
+            self.invalidate()
+
+    def reload_layer(self):
+        """Reload the layer after a provider write that the caller reports with set_values()"""
+        self._reloading = True
+        try:
+            self.layer.reload()
+        finally:
+            self._reloading = False
+
+    def ensure(self):
+        """Build the columns when the cache is stale"""
+        if not self.valid:
+            self._build()
+
+    def _build(self):
+        import numpy as np
+
+        fields = self.layer.fields()
+        self.field_of_index = {index: field.name() for index, field in enumerate(fields)
+                               if is_cached_field(field.name())}
+        self.field_names = list(self.field_of_index.values())
+
+        capacity = max(1024, self.layer.featureCount())
+        self.fids = np.full(capacity, -1, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.codes = {name: np.full(capacity, -1, dtype=np.int32) for name in self.field_names}
+        self.categories = {name: [] for name in self.field_names}
+        self.code_of = {name: {} for name in self.field_names}
+        self.row_of = {}
+        self.size = 0
+
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes(list(self.field_of_index))
+        for feature in self.layer.getFeatures(request):
+            self._append(feature)
+        self.valid = True
+
+    def _code(self, field_name, value):
+        """Category code of a value, registering new values"""
+        value = _cache_value(value)
+        if value is None:
+            return -1
+        code_of = self.code_of[field_name]
+        code = code_of.get(value)
+        if code is None:
+            code = len(self.categories[field_name])
+            code_of[value] = code
+            self.categories[field_name].append(value)
+        return code
+
+    def _append(self, feature):
+        import numpy as np
+
+        if self.size == len(self.fids):
+            # Grow all columns together
+            capacity = 2 * len(self.fids)
+            self.fids = np.concatenate((self.fids, np.full(capacity - self.size, -1, dtype=np.int64)))
+            self.alive = np.concatenate((self.alive, np.zeros(capacity - self.size, dtype=bool)))
+            for name in self.field_names:
+                self.codes[name] = np.concatenate((self.codes[name],
+                                                   np.full(capacity - self.size, -1, dtype=np.int32)))
+
+        row = self.size
+        attributes = feature.attributes()
+        for index, name in self.field_of_index.items():
+            self.codes[name][row] = self._code(name, attributes[index])
+        self.fids[row] = feature.id()
+        self.alive[row] = True
+        self.row_of[feature.id()] = row
+        self.size += 1
+        return row
+
+    def _set_code(self, row, field_name, code):
+        column = self.codes[field_name]
+        old_code = column[row]
+        if old_code != code:
+            column[row] = code
+            for listener in self.listeners:
+                listener.row_changed(row, field_name, old_code)
+
+    def _attribute_value_changed(self, fid, index, value):
+        name = self.field_of_index.get(index)
+        if self.valid and name is not None:
+            row = self.row_of.get(fid)
+            if row is None:
+                self.invalidate()
+            else:
+                self._set_code(row, name, self._code(name, value))
+
+    def _feature_added(self, fid):
+        if self.valid:
+            feature = self.layer.getFeature(fid)
+            if feature.isValid():
+                row = self._append(feature)
+                for listener in self.listeners:
+                    listener.row_added(row)
+            else:
+                self.invalidate()
+
+    def _feature_deleted(self, fid):
+        if self.valid:
+            row = self.row_of.pop(fid, None)
+            if row is not None:
+                for listener in self.listeners:
+                    listener.row_removed(row)
+                self.alive[row] = False
+
+    def set_values(self, fids, field_name, value):
+        """Record a value written for several features outside the edit buffer"""
+        if not self.valid or field_name not in self.codes:
+            return
+        code = self._code(field_name, value)
+        for fid in fids:
+            row = self.row_of.get(fid)
+            if row is not None:
+                self._set_code(row, field_name, code)
+
+    def value_counts(self, field_name):
+        """{value: feature count} of a cached field, None counting NULLs"""
+        import numpy as np
+
+        self.ensure()
+        column = self.codes[field_name][:self.size][self.alive[:self.size]]
+        counts = np.bincount(column + 1, minlength=len(self.categories[field_name]) + 1)
+        result = {value: int(counts[code + 1]) for code, value in enumerate(self.categories[field_name])
+                  if counts[code + 1]}
+        if counts[0]:
+            result[None] = int(counts[0])
+        return result
+
+    def _lookup_code(self, field_name, value):
+        """Code of a value without registering it, -2 (matching nothing) when unseen"""
+        value = _cache_value(value)
+        if value is None:
+            return -1
+        return self.code_of[field_name].get(value, -2)
+
+    def ids_where(self, field_name, value):
+        """Ids of the features whose cached field equals value"""
+        self.ensure()
+        code = self._lookup_code(field_name, value)
+        rows = (self.codes[field_name][:self.size] == code) & self.alive[:self.size]
+        return self.fids[:self.size][rows].tolist()
+
+
+class QcProgressCounts:
+    """DASHBOARD_COLUMNS counts per value of a grouping field (Part or Assign).
+
+    Built once from the columns of a LayerAttributeCache with one bincount
+    per dashboard column, then kept current from the cache's row deltas:
+    an edit moves one row out of its old state and into the new one, so
+    it costs O(1) however large the layer is. ``on_change(group_value)``
+    is called for every group whose counts changed, ``on_reset()`` when
+    the cache went stale and the counts have to be rebuilt.
+    """
+
+    def __init__(self, cache, group_field, on_change=None, on_reset=None):
+        self.cache = cache
+        self.group_field = group_field
+        self.on_change = on_change
+        self.on_reset = on_reset
+        self.counts = {}
+        self.valid = False
+        self.relevant_fields = {group_field} | {field for _, field, _ in DASHBOARD_COLUMNS}
+        cache.listeners.append(self)
+
+    def close(self):
+        if self in self.cache.listeners:
+            self.cache.listeners.remove(self)
+
+    def build(self):
+        """Count all rows of the cache, [total, column counts...] per group value"""
+        import numpy as np
+
+        self.cache.ensure()
+        cache = self.cache
+        alive = cache.alive[:cache.size]
+        groups = cache.codes[self.group_field][:cache.size][alive] + 1
+        group_values = [None] + cache.categories[self.group_field]
+
+        columns = [np.bincount(groups, minlength=len(group_values))]
+        for _, field_name, value in DASHBOARD_COLUMNS:
+            if field_name in cache.codes:
+                matches = cache.codes[field_name][:cache.size][alive] == cache._lookup_code(field_name, value)
+                columns.append(np.bincount(groups, weights=matches, minlength=len(group_values)).astype(np.int64))
+            else:
+                columns.append(np.zeros(len(group_values), dtype=np.int64))
+
+        table = np.column_stack(columns)
+        self.counts = {group_values[code]: [int(count) for count in table[code]]
+                       for code in range(len(group_values)) if table[code, 0]}
+        self.valid = True
+
+    def _row_state(self, row, field_name=None, code=None):
+        """(group value, [1, column flags...]) of a row, optionally with one field's code replaced"""
+        cache = self.cache
+
+        def row_code(name):
+            if name == field_name:
+                return code
+            return cache.codes[name][row] if name in cache.codes else -1
+
+        group_code = row_code(self.group_field)
+        group_value = cache.categories[self.group_field][group_code] if group_code >= 0 else None
+        flags = [1]
+        for _, name, value in DASHBOARD_COLUMNS:
+            flags.append(int(name in cache.codes and row_code(name) == cache._lookup_code(name, value)))
+        return group_value, flags
+
+    def _apply(self, group_value, flags, sign):
+        counts = self.counts.setdefault(group_value, [0] * (len(DASHBOARD_COLUMNS) + 1))
+        for index, flag in enumerate(flags):
+            counts[index] += sign * flag
+        if self.on_change:
+            self.on_change(group_value)
+
+    # Cache listener interface
+
+    def row_changed(self, row, field_name, old_code):
+        if self.valid and field_name in self.relevant_fields:
+            old_group, old_flags = self._row_state(row, field_name, old_code)
+            new_group, new_flags = self._row_state(row)
+            if old_group != new_group or old_flags != new_flags:
+                self._apply(old_group, old_flags, -1)
+                self._apply(new_group, new_flags, 1)
+
+    def row_added(self, row):
+        if self.valid:
+            self._apply(*self._row_state(row), 1)
+
+    def row_removed(self, row):
+        if self.valid:
+            self._apply(*self._row_state(row), -1)
+
+    def reset(self):
+        if self.valid:
+            self.valid = False
+            if self.on_reset:
+                self.on_reset()
+
+
+class WriteBehindJournal:
+    """Append-only JSON lines record of status edits not yet committed.
+
+    Every write-behind click is appended and fsynced before the edit only
+    lives in the layer's edit buffer, and dropped once that layer is
+    committed. Entries keep the value each feature had on disk before the
+    click, so entries left over after a crash are only replayed onto
+    features nobody changed since (see replay_plan()).
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def layer_key(layer):
+        return {"source": layer.source(), "provider": layer.providerType()}
+
+    def append(self, layer, field_name, value, feature_ids, before_values):
+        """Record a click, ``before_values`` maps feature ids to their value on disk"""
+        fids = [int(fid) for fid in feature_ids if fid >= 0]
+        entry = dict(self.layer_key(layer), field=field_name, value=value, fids=fids,
+                     before=[before_values.get(fid) for fid in fids])
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a+b") as journal:
+            # Start on a fresh line if a crash cut the last entry short
+            prefix = b""
+            if journal.tell() > 0:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    prefix = b"\n"
+            journal.write(prefix + (json.dumps(entry) + "\n").encode("utf-8"))
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def entries(self):
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash, everything before it is intact
+                    continue
+        return entries
+
+    def remove_layer(self, layer):
+        """Forget the entries of a layer whose edits reached the disk"""
+        key = self.layer_key(layer)
+        remaining = [entry for entry in self.entries()
+                     if (entry.get("source"), entry.get("provider")) != (key["source"], key["provider"])]
+        if not remaining:
+            self.clear()
+            return
+
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as journal:
+            for entry in remaining:
+                journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def replay_plan(self):
+        """Compare the journaled edits with what is on disk now.
+
+        Returns one dict per layer with its ``source``, ``provider``,
+        ``layer`` (None when it cannot be opened), ``changes`` ({fid:
+        {index: value}} for the features still holding the value they had
+        before the click), ``saved`` (edits already on disk) and
+        ``conflicts`` ([(fid, field)] changed on disk since the click or
+        gone, these are never overwritten).
+        """
+        pending = {}
+        for entry in self.entries():
+            changes = pending.setdefault((entry["source"], entry["provider"]), {})
+            before_values = entry.get("before") or [None] * len(entry["fids"])
+            for fid, before in zip(entry["fids"], before_values):
+                # The first click knows the value on disk, the last one the value to write
+                change = changes.setdefault((fid, entry["field"]), [before, None])
+                change[1] = entry["value"]
+
+        plans = []
+        for (source, provider_key), changes in pending.items():
+            plan = {"source": source, "provider": provider_key, "layer": None, "changes": {},
+                    "saved": 0, "conflicts": []}
+            plans.append(plan)
+            layer = QgsVectorLayer(source, "write-behind replay", provider_key)
+            if not layer.isValid():
+                continue
+            plan["layer"] = layer
+
+            provider = layer.dataProvider()
+            request = QgsFeatureRequest().setFilterFids(sorted({fid for fid, _ in changes}))
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+            on_disk = {feature.id(): feature.attributes() for feature in provider.getFeatures(request)}
+
+            for (fid, field_name), (before, value) in changes.items():
+                index = provider.fields().indexFromName(field_name)
+                attributes = on_disk.get(fid)
+                if index == -1 or attributes is None:
+                    plan["conflicts"].append((fid, field_name))
+                    continue
+                current = _cache_value(attributes[index])
+                if current == value:
+                    plan["saved"] += 1
+                elif current == before:
+                    plan["changes"].setdefault(fid, {})[index] = value
+                else:
+                    plan["conflicts"].append((fid, field_name))
+        return plans
+
+    def replay(self, plans):
+        """Write the changes of replay_plan() through the data providers.
+
+        Returns (features updated, [layer sources that failed]); the journal
+        is cleared when every layer succeeded, conflicting edits with it.
+        """
+        updated = 0
+        failed = []
+        for plan in plans:
+            changes = plan["changes"]
+            if plan["layer"] is None or (changes and not plan["layer"].dataProvider().changeAttributeValues(changes)):
+                failed.append(plan["source"])
+            else:
+                updated += len(changes)
+
+        if not failed:
+            self.clear()
+        return updated, failed
+
+
+def format_feature_ids(feature_ids, limit=20):
+    """Comma separated feature ids, cut after ``limit`` of them"""
+    feature_ids = sorted(feature_ids)
+    text = ", ".join(str(fid) for fid in feature_ids[:limit])
+    if len(feature_ids) > limit:
+        text += f" and {len(feature_ids) - limit} more"
+    return text
+
+
+class ToolTask(QgsTask):
+    """Runs the heavy part of a dock tool in the background.
+
+    ``work(feedback)`` runs in a worker thread, so it may only use inputs
+    gathered on the main thread (feature sources, fields, paths, CRS and
+    transform objects), never map layers. Progress set on ``feedback``
+    drives the task progress and cancelling the task cancels the feedback.
+    Back on the main thread ``on_success`` receives the return value of
+    ``work`` and ``on_error`` any exception it raised; neither is called
+    when the task was cancelled.
+    """
+
+    def __init__(self, description, work, on_success, on_error):
+        super().__init__(description, QgsTask.CanCancel)
+        self.work = work
+        self.on_success = on_success
+        self.on_error = on_error
+        self.feedback = QgsFeedback()
+        self.feedback.progressChanged.connect(self.setProgress, Qt.DirectConnection)
+        self.result_value = None
+        self.exception = None
+
+    def cancel(self):
+        self.feedback.cancel()
+        super().cancel()
+
+    def run(self):
+        try:
+            self.result_value = self.work(self.feedback)
+        except Exception as e:
+            self.exception = e
+            return False
+        return not self.feedback.isCanceled()
+
+    def finished(self, result):
+        if result:
+            self.on_success(self.result_value)
+        elif self.exception is not None:
+            self.on_error(self.exception)
+
+
+class GridCreationTask(QgsTask):
+    """Background task that computes grid cells arithmetically and streams them to disk.
+
+    Cells are generated column by column (top to bottom, like
+    native:creategrid) and written in batches of WRITER_BATCH_SIZE, so
+    memory stays constant whatever the number of cells. ``on_finished`` is
+    called on the main thread with the task once it ends.
+
+    With a ``footprint_source`` only cells intersecting its geometries are
+    produced: a spatial index finds the footprints crossing each column and
+    every footprint is clipped to the column strip, so only the rows under
+    the clipped parts are tested and the full bounding box grid is never
+    generated. Cell ids stay those of the full grid.
+    """
+
+    def __init__(self, path, xmin, ymin, xmax, ymax, spacing, crs, transform_context, on_finished,
+                 footprint_source=None, footprint_transform=None):
+        super().__init__(f"Creating {spacing}m grid", QgsTask.CanCancel)
+        self.path = path
+        self.xmin = xmin
+        self.ymax = ymax
+        self.spacing = spacing
+        self.cols = max(1, int(round((xmax - xmin) / spacing)))
+        self.rows = max(1, int(round((ymax - ymin) / spacing)))
+        self.crs = crs
+        self.transform_context = transform_context
+        self.on_finished = on_finished
+        self.footprint_source = footprint_source
+        self.footprint_transform = footprint_transform
+        self.cell_count = 0
+        self.skipped_count = 0
+        self.elapsed = 0.0
+        # Time spent selecting rows and writing cells, to estimate what skipping saved
+        self.filter_time = 0.0
+        self.write_time = 0.0
+        self.error = None
+
+    def _load_footprints(self):
+        """Spatial index and prepared geometries of the footprints in the grid CRS"""
+        index = QgsSpatialIndex()
+        footprints = {}
+
+        request = QgsFeatureRequest()
+        request.setNoAttributes()
+        for feature in self.footprint_source.getFeatures(request):
+            geom = QgsGeometry(feature.geometry())
+            if geom.isEmpty():
+                continue
+            if self.footprint_transform is not None:
+                geom.transform(self.footprint_transform)
+
+            engine = QgsGeometry.createGeometryEngine(geom.constGet())
+            engine.prepareGeometry()
+            footprints[feature.id()] = (geom, engine)
+            index.addFeature(feature.id(), geom.boundingBox())
+
+        return index, footprints
+
+    def _column_rows(self, left, right, index, footprints):
+        """Rows of one column whose cells intersect a footprint.
+
+        Each candidate footprint is clipped to the column strip first, so
+        a long diagonal footprint only costs the rows its clipped parts
+        span in this column instead of its whole bounding box.
+        """
+        ymin = self.ymax - self.rows * self.spacing
+        strip = QgsRectangle(left, ymin, right, self.ymax)
+        candidates = index.intersects(strip)
+        if not candidates:
+            return []
+
+        strip_geometry = QgsGeometry.fromRect(strip)
+        rows = set()
+        for footprint_id in candidates:
+            geom, engine = footprints[footprint_id]
+            clipped = engine.intersection(strip_geometry.constGet())
+            if clipped is None or clipped.isEmpty():
+                continue
+
+            for part in QgsGeometry(clipped).asGeometryCollection():
+                bbox = part.boundingBox()
+                # Rows whose cells touch the part, cells sharing an edge with it included
+                first_row = max(0, int(math.ceil((self.ymax - bbox.yMaximum()) / self.spacing)) - 1)
+                last_row = min(self.rows - 1, int(math.floor((self.ymax - bbox.yMinimum()) / self.spacing)))
+
+                part_engine = QgsGeometry.createGeometryEngine(part.constGet())
+                for row in range(first_row, last_row + 1):
+                    if row in rows:
+                        continue
+                    top = self.ymax - row * self.spacing
+                    cell = QgsGeometry.fromRect(QgsRectangle(left, top - self.spacing, right, top))
+                    if part_engine.intersects(cell.constGet()):
+                        rows.add(row)
+
+        return sorted(rows)
+
+    def run(self):
+        fields = QgsFields()
+        fields.append(QgsField("id", QVariant.LongLong))
+        for name in ("left", "top", "right", "bottom"):
+            fields.append(QgsField(name, QVariant.Double))
+        fields.append(QgsField("row_index", QVariant.Int))
+        fields.append(QgsField("col_index", QVariant.Int))
+
+        save_options = QgsVectorFileWriter.SaveVectorOptions()
+        save_options.driverName = driver_for_path(self.path)
+        save_options.fileEncoding = "UTF-8"
+        save_options.layerName = os.path.splitext(os.path.basename(self.path))[0]
+
+        writer = QgsVectorFileWriter.create(self.path, fields, QgsWkbTypes.Polygon, self.crs,
+                                            self.transform_context, save_options)
+        if writer.hasError() != QgsVectorFileWriter.NoError:
+            self.error = writer.errorMessage()
+            return False
+
+        start = time.perf_counter()
+        if self.footprint_source is not None:
+            index, footprints = self._load_footprints()
+
+        batch = []
+        for col in range(self.cols):
+            left = self.xmin + col * self.spacing
+            right = left + self.spacing
+
+            if self.footprint_source is not None:
+                filter_start = time.perf_counter()
+                rows = self._column_rows(left, right, index, footprints)
+                self.filter_time += time.perf_counter() - filter_start
+                self.skipped_count += self.rows - len(rows)
+            else:
+                rows = range(self.rows)
+
+            write_start = time.perf_counter()
+            for row in rows:
+                top = self.ymax - row * self.spacing
+                bottom = top - self.spacing
+                self.cell_count += 1
+
+                feature = QgsFeature(fields)
+                feature.setGeometry(QgsGeometry.fromRect(QgsRectangle(left, bottom, right, top)))
+                feature.setAttributes([col * self.rows + row + 1, left, top, right, bottom, row, col])
+                batch.append(feature)
+
+                if len(batch) == WRITER_BATCH_SIZE:
+                    writer.addFeatures(batch)
+                    batch = []
+                    if self.isCanceled():
+                        del writer
+                        return False
+            self.write_time += time.perf_counter() - write_start
+
+            self.setProgress(100.0 * (col + 1) / self.cols)
+
+            if self.isCanceled():
+                del writer
+                return False
+
+        if batch:
+            write_start = time.perf_counter()
+            writer.addFeatures(batch)
+            self.write_time += time.perf_counter() - write_start
+
+        # Deleting the writer flushes and closes the file
+        del writer
+        self.elapsed = time.perf_counter() - start
+        return True
+
+    def finished(self, result):
+        self.on_finished(self, result)
 
 
 class DistributionResultDialog(QDialog):
@@ -58,7 +2411,31 @@ class PhotogrammetryToolsDock(QDockWidget):
     def __init__(self, iface):
         super().__init__("Photogrammetry Tools")
         self.iface = iface
+        # Background tasks must stay referenced until they finish
+        self._active_tasks = []
+        # GeoPackage that "Append to deliverable" exports go to
+        self.deliverable = None
+        # LayerAttributeCache per layer id, dropped with the layer
+        self._attribute_caches = {}
+        # QcProgressCounts shown in the live dashboard and its table row per group value
+        self._dashboard = None
+        self._dashboard_rows = {}
+        # Groups whose row is redrawn in the next event loop pass
+        self._dashboard_dirty = set()
+        # Layers whose edit session the plugin started for write-behind edits: id -> (layer, edit handler)
+        self._write_behind_layers = {}
+        # True while the plugin itself edits or commits one of those layers
+        self._writing_behind = False
+        self._write_behind_journal = WriteBehindJournal(
+            os.path.join(QgsApplication.qgisSettingsDirPath(), "photogrammetry_tools", "write_behind.jsonl"))
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush_pending_edits)
+        QgsProject.instance().layerWillBeRemoved.connect(self._flush_removed_layer)
+        QgsProject.instance().layerWillBeRemoved.connect(self._drop_attribute_cache)
         self.setup_ui()
+        # Status edits journaled before a crash are offered once the GUI is up
+        QTimer.singleShot(0, self._replay_write_behind_journal)
 
     def setup_ui(self):
         self.setObjectName("PhotogrammetryToolsDock")
@@ -160,6 +2537,71 @@ class PhotogrammetryToolsDock(QDockWidget):
         qc_group.setLayout(qc_layout)
         self.scroll_layout.addWidget(qc_group)
 
+        # Deferred saving of status button edits
+        write_behind_layout = QHBoxLayout()
+        self.write_behind_check = QCheckBox("Deferred save")
+        self.write_behind_check.setToolTip("Status buttons edit the layer immediately and commit in one batch "
+                                           f"{WRITE_BEHIND_DELAY_MS // 1000} s after the last click.\n"
+                                           "Pending edits are journaled and recovered after a crash.")
+        self.write_behind_check.toggled.connect(self._write_behind_toggled)
+        write_behind_layout.addWidget(self.write_behind_check)
+        self.btn_flush = QPushButton("Save Now")
+        self.btn_flush.clicked.connect(self.flush_pending_edits)
+        write_behind_layout.addWidget(self.btn_flush)
+        self.scroll_layout.addLayout(write_behind_layout)
+
+        # ========================
+        # QC PROGRESS
+        # ========================
+        progress_group = QGroupBox("QC Progress")
+        progress_group.setCheckable(True)
+        progress_group.setChecked(False)
+        progress_layout = QVBoxLayout()
+
+        self.btn_progress_summary = QPushButton("Progress Summary")
+        self.btn_progress_summary.setToolTip("Status, Remarks and QC counts of the active layer")
+        self.btn_progress_summary.clicked.connect(self.show_progress_summary)
+        progress_layout.addWidget(self.btn_progress_summary)
+
+        # Select by a Bridge field value
+        filter_layout = QHBoxLayout()
+        self.filter_field_combo = QComboBox()
+        self.filter_field_combo.addItems(["Status", "Remarks", "QC", "QCRemarks", "Rework", "Assign", "Part"])
+        self.filter_value_input = QLineEdit()
+        self.filter_value_input.setPlaceholderText("Value (empty = NULL)")
+        btn_filter = QPushButton("Select")
+        btn_filter.clicked.connect(self.select_by_field_value)
+        filter_layout.addWidget(self.filter_field_combo)
+        filter_layout.addWidget(self.filter_value_input)
+        filter_layout.addWidget(btn_filter)
+        progress_layout.addLayout(filter_layout)
+
+        # Live dashboard, updated from edit deltas
+        dashboard_layout = QHBoxLayout()
+        dashboard_layout.addWidget(QLabel("Group by:"))
+        self.dashboard_group_combo = QComboBox()
+        self.dashboard_group_combo.addItems(["Part", "Assign"])
+        dashboard_layout.addWidget(self.dashboard_group_combo)
+        btn_dashboard = QPushButton("Live Dashboard")
+        btn_dashboard.setToolTip("Count production and QC states of the active layer per group once, "
+                                 "then follow its edits")
+        btn_dashboard.clicked.connect(self.start_dashboard)
+        dashboard_layout.addWidget(btn_dashboard)
+        progress_layout.addLayout(dashboard_layout)
+
+        self.dashboard_label = QLabel("")
+        progress_layout.addWidget(self.dashboard_label)
+        self.dashboard_table = QTableWidget(0, len(DASHBOARD_COLUMNS) + 2)
+        self.dashboard_table.setHorizontalHeaderLabels(["Group", "Total"] +
+                                                       [label for label, _, _ in DASHBOARD_COLUMNS])
+        self.dashboard_table.verticalHeader().setVisible(False)
+        self.dashboard_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.dashboard_table.setMinimumHeight(150)
+        progress_layout.addWidget(self.dashboard_table)
+
+        progress_group.setLayout(progress_layout)
+        self.scroll_layout.addWidget(progress_group)
+
         # Add separator between status updaters and tools
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
@@ -190,6 +2632,43 @@ class PhotogrammetryToolsDock(QDockWidget):
         dist_method_layout.addWidget(self.radio_by_parts)
         distribute_layout.addLayout(dist_method_layout)
 
+        # Clustering engine selection
+        engine_layout = QHBoxLayout()
+        engine_layout.addWidget(QLabel("Engine:"))
+        self.dist_engine_combo = QComboBox()
+        self.dist_engine_combo.addItem("K-Means (Exact)", "kmeans")
+        self.dist_engine_combo.addItem("Mini-Batch K-Means (Streaming)", "minibatch")
+        self.dist_engine_combo.addItem("Balanced Bisection (Equal Parts)", "balanced")
+        self.dist_engine_combo.addItem("Hilbert Curve (Fast, No scikit-learn)", "hilbert")
+        self.dist_engine_combo.setToolTip("Streaming reads the layer in chunks with bounded memory, "
+                                          "recommended for multi-million feature layers.\n"
+                                          "Balanced guarantees equal part sizes (within one feature).\n"
+                                          "Hilbert Curve is the fastest and only needs numpy.")
+        engine_layout.addWidget(self.dist_engine_combo)
+        distribute_layout.addLayout(engine_layout)
+
+        # Part field write mode
+        self.fast_part_update_check = QCheckBox("Fast Part update (no undo)")
+        self.fast_part_update_check.setChecked(True)
+        self.fast_part_update_check.setToolTip("Write all Part values to the data provider in one batch, "
+                                               "bypassing the edit buffer.\n"
+                                               "Ignored when the layer is already in edit mode.")
+        distribute_layout.addWidget(self.fast_part_update_check)
+
+        # Part export concurrency
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Export Workers:"))
+        self.export_workers_spin = QSpinBox()
+        self.export_workers_spin.setMinimum(1)
+        self.export_workers_spin.setMaximum(MAX_EXPORT_WORKERS)
+        self.export_workers_spin.setValue(DEFAULT_EXPORT_WORKERS)
+        self.export_workers_spin.setToolTip("Number of part files written in parallel.\n"
+                                            "1 writes all parts in a single pass over the layer; "
+                                            "more workers each read the layer through their own connection "
+                                            "(file based layers only).")
+        workers_layout.addWidget(self.export_workers_spin)
+        distribute_layout.addLayout(workers_layout)
+
         # Number input
         number_layout = QHBoxLayout()
         number_layout.addWidget(QLabel("Number:"))
@@ -221,18 +2700,37 @@ class PhotogrammetryToolsDock(QDockWidget):
         grid_group = QGroupBox("Grid Creation")
         grid_group.setCheckable(True)
         grid_group.setChecked(False)
-        grid_layout = QHBoxLayout()
+        grid_layout = QVBoxLayout()
+        grid_size_layout = QHBoxLayout()
 
         self.grid_size_input = QLineEdit("1000")
-        self.grid_size_input.setValidator(QtGui.QDoubleValidator(1, 100000, 2))
+        self.grid_size_input.setValidator(QtGui.QDoubleValidator(0.01, 100000, 2))
 
         self.btn_grid = QPushButton("Create Grid")
         self.btn_grid.setIcon(QIcon(":/images/themes/default/grid.svg"))
         self.btn_grid.clicked.connect(self.create_grid)
 
-        grid_layout.addWidget(QLabel("Size (m):"))
-        grid_layout.addWidget(self.grid_size_input)
-        grid_layout.addWidget(self.btn_grid)
+        grid_size_layout.addWidget(QLabel("Size (m):"))
+        grid_size_layout.addWidget(self.grid_size_input)
+        grid_size_layout.addWidget(self.btn_grid)
+        grid_layout.addLayout(grid_size_layout)
+
+        # Grid engine selection
+        grid_engine_layout = QHBoxLayout()
+        grid_engine_layout.addWidget(QLabel("Engine:"))
+        self.grid_engine_combo = QComboBox()
+        self.grid_engine_combo.addItem("Processing (native:creategrid)", "processing")
+        self.grid_engine_combo.addItem("Native Streaming (Background)", "native")
+        self.grid_engine_combo.setToolTip("Native Streaming computes cells directly and writes them in batches "
+                                          "to GeoPackage or FlatGeobuf in a cancellable background task")
+        grid_engine_layout.addWidget(self.grid_engine_combo)
+        grid_layout.addLayout(grid_engine_layout)
+
+        self.grid_clip_check = QCheckBox("Only cells intersecting layer features")
+        self.grid_clip_check.setToolTip("Skip cells outside the reference layer geometries "
+                                        "(always uses the Native Streaming engine)")
+        grid_layout.addWidget(self.grid_clip_check)
+
         grid_group.setLayout(grid_layout)
         self.scroll_layout.addWidget(grid_group)
 
@@ -242,7 +2740,8 @@ class PhotogrammetryToolsDock(QDockWidget):
         buffer_group = QGroupBox("Buffer Tool")
         buffer_group.setCheckable(True)
         buffer_group.setChecked(False)
-        buffer_layout = QHBoxLayout()
+        buffer_layout = QVBoxLayout()
+        buffer_size_layout = QHBoxLayout()
 
         self.buffer_size_input = QLineEdit("250")
         self.buffer_size_input.setValidator(QtGui.QDoubleValidator(1, 100000, 2))
@@ -251,9 +2750,33 @@ class PhotogrammetryToolsDock(QDockWidget):
         self.btn_buffer.setIcon(QIcon(":/images/themes/default/buffer.svg"))
         self.btn_buffer.clicked.connect(self.create_buffer)
 
-        buffer_layout.addWidget(QLabel("Distance (m):"))
-        buffer_layout.addWidget(self.buffer_size_input)
-        buffer_layout.addWidget(self.btn_buffer)
+        buffer_size_layout.addWidget(QLabel("Distance (m):"))
+        buffer_size_layout.addWidget(self.buffer_size_input)
+        buffer_size_layout.addWidget(self.btn_buffer)
+        buffer_layout.addLayout(buffer_size_layout)
+
+        # Buffer engine selection
+        buffer_engine_layout = QHBoxLayout()
+        buffer_engine_layout.addWidget(QLabel("Engine:"))
+        self.buffer_engine_combo = QComboBox()
+        self.buffer_engine_combo.addItem("Processing (native:buffer)", "processing")
+        self.buffer_engine_combo.addItem("Parallel Chunks (Background)", "parallel")
+        self.buffer_engine_combo.setToolTip("Parallel Chunks buffers the layer in chunks of features on "
+                                            f"{DEFAULT_EXPORT_WORKERS} worker threads and keeps the input feature order")
+        buffer_engine_layout.addWidget(self.buffer_engine_combo)
+        buffer_layout.addLayout(buffer_engine_layout)
+
+        # Adaptive segment count
+        buffer_segments_layout = QHBoxLayout()
+        self.buffer_adaptive_check = QCheckBox("Adaptive segments, max deviation (m):")
+        self.buffer_adaptive_check.setToolTip("Derive the segments per quarter circle from the buffer distance "
+                                              "so no edge strays further than this from the true arc.\n"
+                                              f"Unchecked always uses {BUFFER_SEGMENTS} segments.")
+        self.buffer_deviation_input = QLineEdit("0.05")
+        self.buffer_deviation_input.setValidator(QtGui.QDoubleValidator(0.001, 1000, 3))
+        buffer_segments_layout.addWidget(self.buffer_adaptive_check)
+        buffer_segments_layout.addWidget(self.buffer_deviation_input)
+        buffer_layout.addLayout(buffer_segments_layout)
         buffer_group.setLayout(buffer_layout)
         self.scroll_layout.addWidget(buffer_group)
 
@@ -307,6 +2830,30 @@ class PhotogrammetryToolsDock(QDockWidget):
         btn_line_intersections.clicked.connect(self.generate_line_intersections)
         conversion_layout.addWidget(btn_line_intersections)
 
+        # Line intersection engine selection
+        intersection_engine_layout = QHBoxLayout()
+        intersection_engine_layout.addWidget(QLabel("Intersection Engine:"))
+        self.intersection_engine_combo = QComboBox()
+        self.intersection_engine_combo.addItem("Processing (native:lineintersections)", "processing")
+        self.intersection_engine_combo.addItem("Native Segments (Parallel, NumPy)", "native")
+        self.intersection_engine_combo.setToolTip("Native Segments splits both layers into segments, pairs them "
+                                                  "through a grid index and solves the pairs in vectorized batches "
+                                                  f"on {DEFAULT_EXPORT_WORKERS} worker threads")
+        intersection_engine_layout.addWidget(self.intersection_engine_combo)
+        conversion_layout.addLayout(intersection_engine_layout)
+
+        # Crossings within one line layer
+        btn_line_crossings = QPushButton("Find Line Crossings (Single Layer)")
+        btn_line_crossings.setToolTip("Points where lines of the active layer cross each other, "
+                                      "with FID_A/FID_B and QC fields for review")
+        btn_line_crossings.clicked.connect(self.find_line_crossings)
+        conversion_layout.addWidget(btn_line_crossings)
+
+        self.crossing_touches_check = QCheckBox("Include endpoint touches")
+        self.crossing_touches_check.setToolTip("Also report lines ending on another line or meeting end to end, "
+                                               "which shared seamline boundaries do everywhere")
+        conversion_layout.addWidget(self.crossing_touches_check)
+
         conversion_group.setLayout(conversion_layout)
         self.scroll_layout.addWidget(conversion_group)
 
@@ -315,6 +2862,20 @@ class PhotogrammetryToolsDock(QDockWidget):
         btn_merge_layers.clicked.connect(self.merge_vector_layers)
         conversion_layout.addWidget(btn_merge_layers)
 
+        # Merge engine selection
+        merge_engine_layout = QHBoxLayout()
+        merge_engine_layout.addWidget(QLabel("Merge Engine:"))
+        self.merge_engine_combo = QComboBox()
+        self.merge_engine_combo.addItem("Processing (Shapefile)", "processing")
+        self.merge_engine_combo.addItem("Streaming (GeoPackage / FlatGeobuf)", "streaming")
+        self.merge_engine_combo.addItem("Streaming, Parallel Readers", "parallel")
+        self.merge_engine_combo.setToolTip("Streaming unites the layer schemas once and writes all layers "
+                                           "through a single writer, reprojecting only layers in another CRS.\n"
+                                           f"Parallel Readers reads up to {DEFAULT_EXPORT_WORKERS} layers at once "
+                                           "while keeping the output order of a serial merge.")
+        merge_engine_layout.addWidget(self.merge_engine_combo)
+        conversion_layout.addLayout(merge_engine_layout)
+
         conversion_group.setLayout(conversion_layout)
         self.scroll_layout.addWidget(conversion_group)
 
@@ -369,6 +2930,18 @@ class PhotogrammetryToolsDock(QDockWidget):
         self.btn_export.clicked.connect(self.save_selected_features)
         export_layout.addWidget(self.btn_export)
 
+        # Append mode into one deliverable GeoPackage
+        deliverable_layout = QHBoxLayout()
+        self.export_append_check = QCheckBox("Append to deliverable GeoPackage")
+        self.export_append_check.setToolTip("Write each selection as a table of one GeoPackage, "
+                                            "appending when the table already exists")
+        deliverable_layout.addWidget(self.export_append_check)
+        btn_deliverable = QPushButton("Set...")
+        btn_deliverable.setToolTip("Choose the deliverable GeoPackage")
+        btn_deliverable.clicked.connect(self.choose_deliverable)
+        deliverable_layout.addWidget(btn_deliverable)
+        export_layout.addLayout(deliverable_layout)
+
         export_group.setLayout(export_layout)
         self.scroll_layout.addWidget(export_group)
 
@@ -398,306 +2971,280 @@ class PhotogrammetryToolsDock(QDockWidget):
                                 "This tool only supports Point and Polygon layers!")
             return
 
-        try:
-            # Get distribution parameters
-            distribute_by_points = self.radio_by_points.isChecked()
-            number_value = self.distribute_number.value()
-
-            # Perform clustering
-            clusters, distribution_info = self.perform_clustering(layer, distribute_by_points, number_value)
-
-            if not clusters:
-                QMessageBox.warning(self, "Clustering Failed", "Failed to create clusters!")
-                return
-
-            # Show distribution results dialog
-            result_dialog = DistributionResultDialog(distribution_info, self)
-            if result_dialog.exec_() != QDialog.Accepted:
-                return  # User cancelled
-
-            # Get base name for parts
-            base_name, ok = QInputDialog.getText(
-                self, "Base Name", "Enter base name for parts:",
-                QLineEdit.Normal, f"{layer.name()}_Part"
-            )
-            if not ok or not base_name.strip():
-                return
-
-            base_name = base_name.strip()
+        # Get distribution parameters
+        distribute_by_points = self.radio_by_points.isChecked()
+        number_value = self.distribute_number.value()
+        engine = self.dist_engine_combo.currentData()
 
-            # Get output directory
-            output_dir = QFileDialog.getExistingDirectory(
-                self, "Select Output Directory", QgsProject.instance().homePath()
-            )
-            if not output_dir:
-                return
+        if not self._check_clustering_dependencies(engine):
+            return
 
-            # Save clustered parts
-            self.save_clustered_parts(layer, clusters, base_name, output_dir)
+        # Perform clustering in the background
+        source = QgsVectorLayerFeatureSource(layer)
+        point_geometry = geom_type == QgsWkbTypes.PointGeometry
+        feature_count = layer.featureCount()
+        extent = layer.extent()
+
+        self._run_in_background(
+            f"Distributing {layer.name()}",
+            lambda feedback: cluster_features(source, point_geometry, feature_count, extent,
+                                              distribute_by_points, number_value, engine, feedback),
+            lambda result: self._clustering_finished(layer, result),
+            "Clustering Error"
+        )
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred during distribution:\n{str(e)}")
+    def _check_clustering_dependencies(self, engine):
+        """Make sure the libraries needed by the clustering engine are installed"""
+        # Only the K-Means engines need scikit-learn
+        return self._check_dependencies(needs_sklearn=engine in ("kmeans", "minibatch"))
 
-    def perform_clustering(self, layer, distribute_by_points, number_value):
-        """Perform clustering based on user selection"""
+    def _check_dependencies(self, needs_sklearn=False):
+        """Make sure numpy (and optionally scikit-learn) are installed"""
+        # Import required libraries inside the function to avoid plugin loading issues
         try:
-            # Import required libraries inside the function to avoid plugin loading issues
-            try:
-                from sklearn.cluster import KMeans
-                import numpy as np
-            except ImportError:
-                QMessageBox.critical(self, "Missing Dependencies",
-                                     "This tool requires scikit-learn and numpy libraries.\n\n"
-                                     "To install them:\n"
-                                     "1. Open OSGeo4W Shell (or Command Prompt)\n"
-                                     "2. Run: pip install scikit-learn numpy\n\n"
-                                     "Alternative installation:\n"
-                                     "1. Open QGIS Python Console\n"
-                                     "2. Run: import subprocess; subprocess.check_call(['pip', 'install', 'scikit-learn', 'numpy'])")
-                return None, ""
-
-            # Extract coordinates from features
-            coordinates = []
-            feature_ids = []
-
-            for feature in layer.getFeatures():
-                geom = feature.geometry()
-                if geom.isEmpty():
-                    continue
-
-                if layer.geometryType() == QgsWkbTypes.PointGeometry:
-                    point = geom.asPoint()
-                    coordinates.append([point.x(), point.y()])
-                elif layer.geometryType() == QgsWkbTypes.PolygonGeometry:
-                    centroid = geom.centroid().asPoint()
-                    coordinates.append([centroid.x(), centroid.y()])
-
-                feature_ids.append(feature.id())
-
-            if len(coordinates) < 2:
-                QMessageBox.warning(self, "Insufficient Features",
-                                    "Need at least 2 features for clustering!")
-                return None, ""
-
-            coordinates = np.array(coordinates)
-
-            # Determine number of clusters
-            if distribute_by_points:
-                # By points per part
-                total_features = len(coordinates)
-                n_clusters = max(1, int(np.ceil(total_features / number_value)))
-            else:
-                # By number of parts
-                n_clusters = min(number_value, len(coordinates))
-
-            # Perform K-means clustering
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-            cluster_labels = kmeans.fit_predict(coordinates)
-
-            # Create clusters dictionary
-            clusters = {}
-            for i, (feature_id, cluster_id) in enumerate(zip(feature_ids, cluster_labels)):
-                if cluster_id not in clusters:
-                    clusters[cluster_id] = []
-                clusters[cluster_id].append(feature_id)
-
-            # Generate distribution info
-            distribution_info = f"Total Features: {len(coordinates)}\n"
-            distribution_info += f"Number of Parts Created: {len(clusters)}\n\n"
-            distribution_info += "Distribution Details:\n"
-
-            for cluster_id, feature_ids_in_cluster in clusters.items():
-                distribution_info += f"Part {cluster_id + 1}: {len(feature_ids_in_cluster)} features\n"
+            import numpy  # noqa: F401
+            if needs_sklearn:
+                import sklearn.cluster  # noqa: F401
+        except ImportError:
+            packages = ["scikit-learn", "numpy"] if needs_sklearn else ["numpy"]
+            QMessageBox.critical(self, "Missing Dependencies",
+                                 f"This tool requires {' and '.join(packages)} libraries.\n\n"
+                                 "To install them:\n"
+                                 "1. Open OSGeo4W Shell (or Command Prompt)\n"
+                                 f"2. Run: pip install {' '.join(packages)}\n\n"
+                                 "Alternative installation:\n"
+                                 "1. Open QGIS Python Console\n"
+                                 f"2. Run: import subprocess; subprocess.check_call(['pip', 'install', "
+                                 f"{', '.join(repr(package) for package in packages)}])")
+            return False
+        return True
+
+    def _clustering_finished(self, layer, result):
+        """Review a finished clustering run and save the parts"""
+        clusters, total_features, timings = result
+        if not clusters:
+            QMessageBox.warning(self, "Clustering Failed", "Failed to create clusters!")
+            return
 
-            return clusters, distribution_info
+        distribution_info = self._format_distribution_info(total_features, clusters, timings)
 
-        except Exception as e:
-            QMessageBox.critical(self, "Clustering Error", f"Error during clustering:\n{str(e)}")
-            return None, ""
+        # Show distribution results dialog
+        result_dialog = DistributionResultDialog(distribution_info, self)
+        if result_dialog.exec_() != QDialog.Accepted:
+            return  # User cancelled
 
-    def update_attribute(self, field_name, value, description):
-        """Generic method to update attributes - FIXED VERSION"""
-        layer = self.iface.activeLayer()
-        if not layer or layer.type() != QgsVectorLayer.VectorLayer:
-            QMessageBox.warning(self, "Invalid Layer", "Please select a vector layer!")
+        # Get base name for parts
+        base_name, ok = QInputDialog.getText(
+            self, "Base Name", "Enter base name for parts:",
+            QLineEdit.Normal, f"{layer.name()}_Part"
+        )
+        if not ok or not base_name.strip():
             return
 
-        field_index = layer.fields().indexFromName(field_name)
-        if field_index == -1:
-            QMessageBox.warning(self, "Missing Field", f"'{field_name}' field not found!")
-            return
+        base_name = base_name.strip()
 
-        selected = layer.selectedFeatures()
-        if not selected:
-            QMessageBox.warning(self, "No Selection", "Please select features first!")
+        # Get output directory
+        output_dir = QFileDialog.getExistingDirectory(
+            self, "Select Output Directory", QgsProject.instance().homePath()
+        )
+        if not output_dir:
             return
 
-        # Get field type to handle conversions properly
-        field = layer.fields().at(field_index)
-        field_type = field.type()
+        # Save clustered parts
+        self.save_clustered_parts(layer, clusters, base_name, output_dir)
 
-        layer.startEditing()
-        try:
-            for feature in selected:
-                # Convert value based on field type
-                converted_value = self._convert_value_for_field(value, field_type)
-                layer.changeAttributeValue(feature.id(), field_index, converted_value)
+    def _format_distribution_info(self, total_features, clusters, timings):
+        """Build the summary shown in DistributionResultDialog"""
+        distribution_info = f"Total Features: {total_features}\n"
+        distribution_info += f"Number of Parts Created: {len(clusters)}\n"
+        for label, seconds in timings:
+            distribution_info += f"{label}: {seconds:.2f} s\n"
+        if clusters:
+            part_sizes = [len(feature_ids) for feature_ids in clusters.values()]
+            distribution_info += f"Part Sizes: {min(part_sizes)} - {max(part_sizes)} features\n"
+        distribution_info += "\nDistribution Details:\n"
 
-            layer.commitChanges()
+        for cluster_id, feature_ids_in_cluster in clusters.items():
+            distribution_info += f"Part {cluster_id + 1}: {len(feature_ids_in_cluster)} features\n"
 
-            self.iface.messageBar().pushSuccess(
-                f"{field_name} Updated",
-                f"Set {description} for {len(selected)} features to '{value}'"
-            )
-        except Exception as e:
-            layer.rollBack()
-            QMessageBox.critical(self, "Update Error",
-                                 f"Failed to update {field_name}:\n{str(e)}")
+        return distribution_info
 
     def _convert_value_for_field(self, value, field_type):
         """Convert value to appropriate type for the field"""
-        if field_type == QVariant.Int:
-            # Handle integer fields
-            if value == "" or value is None:
-                return None  # Use NULL instead of empty string
-            try:
-                return int(value)
-            except (ValueError, TypeError):
-                return None
-        elif field_type == QVariant.Double:
-            # Handle double/float fields
-            if value == "" or value is None:
-                return None
-            try:
-                return float(value)
-            except (ValueError, TypeError):
-                return None
-        else:
-            # Handle string fields and others
-            return str(value) if value is not None else ""
+        return FIELD_VALUE_CONVERTERS.get(field_type, _to_string_value)(value)
 
     def save_clustered_parts(self, layer, clusters, base_name, output_dir):
         """Save each cluster as a separate shapefile - FIXED VERSION"""
         try:
-            saved_files = []
-
             # Add Part field to layer if it doesn't exist
-            layer.startEditing()
             provider = layer.dataProvider()
-            fields = provider.fields()
-            part_field_index = fields.indexFromName("Part")
-
-            if part_field_index == -1:
+            if provider.fields().indexFromName("Part") == -1:
                 provider.addAttributes([QgsField("Part", QVariant.Int)])
                 layer.updateFields()
-                part_field_index = layer.fields().indexFromName("Part")
 
-            # Update Part field for all features - FIXED: Ensure integer values
-            for cluster_id, feature_ids in clusters.items():
-                part_number = int(cluster_id + 1)  # Ensure it's an integer
-                for feature_id in feature_ids:
-                    # Use integer value, not string
-                    layer.changeAttributeValue(feature_id, part_field_index, part_number)
+            update_start = time.perf_counter()
+            use_bulk = (self.fast_part_update_check.isChecked() and not layer.isEditable() and
+                        bool(provider.capabilities() & QgsVectorDataProvider.ChangeAttributeValues))
 
-            layer.commitChanges()
-
-            # Save each cluster as separate shapefile
-            for cluster_id, feature_ids in clusters.items():
-                part_name = f"{base_name}_{cluster_id + 1}"
-                output_path = os.path.join(output_dir, f"{part_name}.shp")
-
-                # Create a memory layer for this cluster
-                temp_layer = self.create_cluster_layer(layer, feature_ids, part_name)
-
-                if temp_layer:
-                    # Save to shapefile
-                    save_options = QgsVectorFileWriter.SaveVectorOptions()
-                    save_options.driverName = "ESRI Shapefile"
-                    save_options.fileEncoding = "UTF-8"
-
-                    transform_context = QgsProject.instance().transformContext()
-                    result = QgsVectorFileWriter.writeAsVectorFormatV3(
-                        temp_layer, output_path, transform_context, save_options
-                    )
-
-                    if result[0] == QgsVectorFileWriter.NoError:
-                        saved_files.append(output_path)
-
-                        # Load the saved layer
-                        saved_layer = QgsVectorLayer(output_path, part_name, "ogr")
-                        if saved_layer.isValid():
-                            QgsProject.instance().addMapLayer(saved_layer)
-
-            # Show success message
-            if saved_files:
-                QMessageBox.information(self, "Success",
-                                        f"Successfully created {len(saved_files)} part files:\n" +
-                                        f"Location: {output_dir}\n" +
-                                        f"Files: {base_name}_001.shp to {base_name}_{len(saved_files):03d}.shp")
+            if use_bulk:
+                self._write_part_values_bulk(layer, clusters)
+                update_mode = "bulk provider write"
             else:
-                QMessageBox.warning(self, "No Files Created",
-                                    "No files were created. Please check the layer and try again.")
+                layer.startEditing()
+                part_field_index = layer.fields().indexFromName("Part")
+
+                # Update Part field for all features - FIXED: Ensure integer values
+                for cluster_id, feature_ids in clusters.items():
+                    part_number = int(cluster_id + 1)  # Ensure it's an integer
+                    for feature_id in feature_ids:
+                        # Use integer value, not string
+                        layer.changeAttributeValue(feature_id, part_field_index, part_number)
+
+                layer.commitChanges()
+                update_mode = "edit buffer"
+            update_time = time.perf_counter() - update_start
 
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Error saving clustered parts:\n{str(e)}")
+            return
 
-    def create_cluster_layer(self, source_layer, feature_ids, layer_name):
-        """Create a memory layer containing only the specified features - FIXED VERSION"""
-        try:
-            # Create memory layer with same geometry type and CRS
-            geom_type_str = "Point" if source_layer.geometryType() == QgsWkbTypes.PointGeometry else "Polygon"
-
-            # Create field definitions string with proper types
-            field_defs = []
-            for field in source_layer.fields():
-                field_name = field.name()
-                # Map QVariant types to memory layer type strings
-                if field.type() == QVariant.Int:
-                    field_type = "integer"
-                elif field.type() == QVariant.Double:
-                    field_type = "double"
-                elif field.type() == QVariant.Bool:
-                    field_type = "boolean"
-                else:
-                    field_type = "string"
+        # Save each cluster as separate shapefile in the background
+        source_fields = layer.fields()
+        wkb_type = layer.wkbType()
+        crs = layer.crs()
+        transform_context = QgsProject.instance().transformContext()
+        workers = min(self.export_workers_spin.value(), len(clusters))
+
+        # Parallel workers reopen the source, which needs a file based layer without pending edits
+        # whose fields all come from the provider (no joins or virtual fields)
+        if (workers > 1 and provider.name() == "ogr" and not layer.isEditable() and
+                source_fields == provider.fields()):
+            provider_key = provider.name()
+            uri = provider.dataSourceUri()
+
+            def work(feedback):
+                return write_clustered_parts_parallel(provider_key, uri, source_fields, wkb_type, crs,
+                                                      transform_context, clusters, base_name, output_dir,
+                                                      workers, feedback)
+            export_mode = f"{workers} workers"
+        else:
+            # Single pass over the source streaming every feature to its part
+            source = QgsVectorLayerFeatureSource(layer)
+
+            def work(feedback):
+                return write_clustered_parts(source, source_fields, wkb_type, crs, transform_context,
+                                             clusters, base_name, output_dir, feedback)
+            export_mode = "single pass"
+
+        def timed_work(feedback):
+            export_start = time.perf_counter()
+            written_parts, errors = work(feedback)
+            return written_parts, errors, time.perf_counter() - export_start
+
+        self._run_in_background(
+            f"Saving {len(clusters)} parts of {layer.name()}",
+            timed_work,
+            lambda result: self._clustered_parts_saved(result[0], result[1], base_name, output_dir,
+                                                       update_time, update_mode, result[2], export_mode),
+            "Save Error"
+        )
+
+    def _clustered_parts_saved(self, written_parts, errors, base_name, output_dir, update_time, update_mode,
+                               export_time, export_mode):
+        """Load the part files written by write_clustered_parts and report the parts that failed"""
+        saved_files = []
+        for output_path, part_name in written_parts:
+            saved_files.append(output_path)
+
+            # Load the saved layer
+            saved_layer = QgsVectorLayer(output_path, part_name, "ogr")
+            if saved_layer.isValid():
+                QgsProject.instance().addMapLayer(saved_layer)
+
+        if errors:
+            shown = "\n".join(errors[:10])
+            if len(errors) > 10:
+                shown += f"\n... and {len(errors) - 10} more"
+            QMessageBox.warning(self, "Part Export Errors",
+                                f"{len(errors)} of {len(saved_files) + len(errors)} part files could not be "
+                                f"written:\n{shown}")
+
+        # Show success message
+        if saved_files and not errors:
+            QMessageBox.information(self, "Success",
+                                    f"Successfully created {len(saved_files)} part files:\n" +
+                                    f"Location: {output_dir}\n" +
+                                    f"Files: {base_name}_001.shp to {base_name}_{len(saved_files):03d}.shp\n" +
+                                    f"Part field update: {update_time:.2f} s ({update_mode})\n" +
+                                    f"Part export: {export_time:.2f} s ({export_mode})")
+        elif not errors:
+            QMessageBox.warning(self, "No Files Created",
+                                "No files were created. Please check the layer and try again.")
+
+    def _write_part_values_bulk(self, layer, clusters):
+        """Write all Part values with one provider call, bypassing the edit buffer and undo stack"""
+        provider = layer.dataProvider()
+        part_field_index = provider.fields().indexFromName("Part")
 
-                field_defs.append(f"field={field_name}:{field_type}")
+        attribute_map = {}
+        for cluster_id, feature_ids in clusters.items():
+            part_number = int(cluster_id + 1)
+            for feature_id in feature_ids:
+                attribute_map[feature_id] = {part_field_index: part_number}
 
-            fields_str = "&".join(field_defs) if field_defs else "field=id:integer"
+        if not provider.changeAttributeValues(attribute_map):
+            raise RuntimeError(f"The data provider rejected the Part values: {provider.error().message()}")
 
-            memory_layer_string = f"{geom_type_str}?crs={source_layer.crs().authid()}&{fields_str}"
-            memory_layer = QgsVectorLayer(memory_layer_string, layer_name, "memory")
+        # The layer did not see the change, reload so the attribute table (and attribute cache) is current
+        layer.reload()
 
-            if not memory_layer.isValid():
-                return None
+    # =========================================
+    # Background Tasks
+    # =========================================
 
-            # Add features to memory layer
-            memory_layer.startEditing()
-            provider = memory_layer.dataProvider()
+    def _start_task(self, task, *keep_alive):
+        """Hand a task to the QGIS task manager.
 
-            for feature_id in feature_ids:
-                feature = source_layer.getFeature(feature_id)
-                if feature.isValid():
-                    # Create new feature with same geometry and attributes
-                    new_feature = QgsFeature(memory_layer.fields())
-                    new_feature.setGeometry(feature.geometry())
+        The task (and any objects it depends on) stays referenced until it
+        completes or is terminated, several tasks can run at the same time.
+        """
+        entry = (task,) + keep_alive
+        self._active_tasks.append(entry)
 
-                    # Set attributes with proper type conversion
-                    attributes = []
-                    for i, attr_value in enumerate(feature.attributes()):
-                        field = memory_layer.fields().at(i)
-                        converted_value = self._convert_value_for_field(attr_value, field.type())
-                        attributes.append(converted_value)
+        def release():
+            self._active_tasks = [active for active in self._active_tasks if active is not entry]
 
-                    new_feature.setAttributes(attributes)
-                    provider.addFeature(new_feature)
+        task.taskCompleted.connect(release)
+        task.taskTerminated.connect(release)
+        QgsApplication.taskManager().addTask(task)
 
-            memory_layer.commitChanges()
-            return memory_layer
+    def _run_in_background(self, description, work, on_success, error_title="Error"):
+        """Run ``work(feedback)`` in a ToolTask and pass its result to ``on_success``"""
+        def on_error(exception):
+            QMessageBox.critical(self, error_title, f"{description} failed:\n{str(exception)}")
 
-        except Exception as e:
-            print(f"Error creating cluster layer: {str(e)}")
-            return None
+        self._start_task(ToolTask(description, work, on_success, on_error))
+
+    def _run_algorithm(self, algorithm_id, parameters, on_success, *keep_alive):
+        """Run a processing algorithm in the background.
+
+        ``on_success(context, results)`` is called on the main thread, memory
+        outputs can be taken from the context with takeResultLayer().
+        """
+        algorithm = QgsApplication.processingRegistry().algorithmById(algorithm_id)
+        context = QgsProcessingContext()
+        context.setProject(QgsProject.instance())
+        feedback = QgsProcessingFeedback()
+        task = QgsProcessingAlgRunnerTask(algorithm, parameters, context, feedback)
+
+        def executed(successful, results):
+            if successful:
+                on_success(context, results)
+            elif not feedback.isCanceled():
+                QMessageBox.critical(self, "Error", f"{algorithm.displayName()} failed!")
+
+        task.executed.connect(executed)
+        self._start_task(task, context, feedback, *keep_alive)
 
     # =========================================
     # CRS Handling
@@ -763,13 +3310,47 @@ class PhotogrammetryToolsDock(QDockWidget):
         if ymax <= ymin:
             ymax = ymin + spacing
 
+        clip_to_features = self.grid_clip_check.isChecked()
+        if clip_to_features and layer.type() != QgsVectorLayer.VectorLayer:
+            QMessageBox.warning(self, "Invalid Layer",
+                                "Clipping to layer features needs a vector reference layer!")
+            return
+
+        # Clipping is only implemented by the native engine
+        native_engine = self.grid_engine_combo.currentData() == "native" or clip_to_features
+
         # Get output path
-        path, _ = QFileDialog.getSaveFileName(self, "Save Grid", "", "Shapefiles (*.shp)")
+        if native_engine:
+            file_filter = "GeoPackage (*.gpkg);;FlatGeobuf (*.fgb);;Shapefiles (*.shp)"
+        else:
+            file_filter = "Shapefiles (*.shp)"
+        path, _ = QFileDialog.getSaveFileName(self, "Save Grid", "", file_filter)
         if not path:
             return
 
+        if native_engine:
+            # Generate and write the cells in a background task
+            footprint_source = None
+            footprint_transform = None
+            if clip_to_features:
+                # Feature sources are safe to read from the task thread, layers are not
+                footprint_source = QgsVectorLayerFeatureSource(layer)
+                if source_crs != crs:
+                    footprint_transform = transform
+
+            task = GridCreationTask(path, xmin, ymin, xmax, ymax, spacing, crs,
+                                    QgsProject.instance().transformContext(), self._grid_task_finished,
+                                    footprint_source, footprint_transform)
+            self._start_task(task)
+            self.iface.messageBar().pushInfo("Grid Creation", f"Creating {spacing}m grid in the background...")
+            return
+
+        # Calculate grid dimensions
+        cols = int(round((xmax - xmin) / spacing))
+        rows = int(round((ymax - ymin) / spacing))
+
         # Create grid using QGIS algorithm
-        result = processing.run("native:creategrid", {
+        self._run_algorithm("native:creategrid", {
             'TYPE': 2,  # Rectangle (polygon)
             'EXTENT': f"{xmin},{xmax},{ymin},{ymax}",
             'HSPACING': spacing,
@@ -778,12 +3359,32 @@ class PhotogrammetryToolsDock(QDockWidget):
             'VOVERLAY': 0,
             'CRS': crs,
             'OUTPUT': path
-        })
+        }, lambda context, results: self._show_grid_layer(path, spacing, crs, cols, rows))
 
-        if 'OUTPUT' not in result:
-            QMessageBox.critical(self, "Error", "Failed to create grid!")
+    def _grid_task_finished(self, task, result):
+        """Load the grid written by a GridCreationTask"""
+        if not result:
+            if task.error:
+                QMessageBox.critical(self, "Error", f"Failed to create grid:\n{task.error}")
+            else:
+                self.iface.messageBar().pushWarning("Grid Creation", "Grid creation was cancelled")
             return
 
+        if task.footprint_source is not None:
+            # Skipped cells would have cost about as much to write as the kept ones, the
+            # time spent choosing the rows is what the clipping costs in exchange
+            seconds_per_cell = task.write_time / task.cell_count if task.cell_count else 0.0
+            self.iface.messageBar().pushInfo(
+                "Grid Creation",
+                f"Kept {task.cell_count} cells intersecting the layer, skipped {task.skipped_count} "
+                f"(about {task.skipped_count * seconds_per_cell:.1f} s of writes avoided, "
+                f"{task.filter_time:.1f} s spent selecting rows, {task.elapsed:.1f} s total)"
+            )
+
+        self._show_grid_layer(task.path, task.spacing, task.crs, task.cols, task.rows)
+
+    def _show_grid_layer(self, path, spacing, crs, cols, rows):
+        """Add a grid output to the project and zoom to it"""
         # Load and display grid
         grid_layer = QgsVectorLayer(path, os.path.splitext(os.path.basename(path))[0], "ogr")
         if not grid_layer.isValid():
@@ -801,10 +3402,6 @@ class PhotogrammetryToolsDock(QDockWidget):
         self.iface.mapCanvas().setExtent(grid_layer.extent())
         self.iface.mapCanvas().refresh()
 
-        # Calculate grid dimensions
-        cols = int(round((xmax - xmin) / spacing))
-        rows = int(round((ymax - ymin) / spacing))
-
         QMessageBox.information(self, "Success",
                                 f"{spacing}m grid created with {cols}x{rows} cells\n"
                                 f"Output CRS: {crs.description()}")
@@ -828,33 +3425,136 @@ class PhotogrammetryToolsDock(QDockWidget):
             QMessageBox.warning(self, "Invalid Layer", "Please select a polygon layer!")
             return
 
-        # Reproject to target CRS first
-        if layer.crs() != crs:
-            reprojected_layer = processing.run("native:reprojectlayer", {
-                'INPUT': layer,
-                'TARGET_CRS': crs,
-                'OUTPUT': 'memory:'
-            })['OUTPUT']
-            layer = reprojected_layer
-
         path, _ = QFileDialog.getSaveFileName(self, "Save Buffer", "", "Shapefiles (*.shp)")
         if not path:
             return
 
+        segments = BUFFER_SEGMENTS
+        segments_report = ""
+        if self.buffer_adaptive_check.isChecked():
+            try:
+                max_deviation = float(self.buffer_deviation_input.text())
+            except ValueError:
+                QMessageBox.warning(self, "Invalid Input", "Please enter a valid maximum deviation in meters!")
+                return
+            segments = buffer_segments_for_tolerance(distance, max_deviation)
+
+            # Small sample so the saving against the fixed segment count can be reported,
+            # buffered in the background before the buffer itself starts
+            request = QgsFeatureRequest()
+            if layer.crs() != crs:
+                request.setDestinationCrs(crs, QgsProject.instance().transformContext())
+            source = QgsVectorLayerFeatureSource(layer)
+
+            def sample_done(result):
+                sampled, fixed_vertices, fixed_time, vertices, sample_time = result
+                segments_report = ""
+                if fixed_vertices:
+                    segments_report = (f"\nSample of {sampled} features vs {BUFFER_SEGMENTS} segments: "
+                                       f"{100.0 * (1 - vertices / fixed_vertices):.0f}% fewer vertices, "
+                                       f"{fixed_time / max(sample_time, 1e-9):.1f}x faster")
+                self._start_buffer(layer, path, distance, crs, segments, segments_report)
+
+            self._run_in_background(
+                f"Sampling {layer.name()} for the buffer segment count",
+                lambda feedback: compare_buffer_segments(source, request, distance, segments),
+                sample_done, "Buffer Error")
+            return
+
+        self._start_buffer(layer, path, distance, crs, segments, segments_report)
+
+    def _start_buffer(self, layer, path, distance, crs, segments, segments_report):
+        """Buffer a layer with the selected engine"""
         layer_name = os.path.splitext(os.path.basename(path))[0]
 
-        # Create buffer with smoother parameters
-        processing.run("native:buffer", {
-            'INPUT': layer,
-            'DISTANCE': distance,
-            'SEGMENTS': 50,  # Increased from 20 to 50 for smoother curves
-            'END_CAP_STYLE': 0,  # Round cap
-            'JOIN_STYLE': 1,  # Round join
-            'MITER_LIMIT': 2,
-            'DISSOLVE': False,
-            'OUTPUT': path
-        })
+        start = time.perf_counter()
+        if self.buffer_engine_combo.currentData() == "parallel":
+            self._create_buffer_parallel(layer, path, layer_name, distance, crs, segments, segments_report)
+            return
+
+        def buffer_layer(input_layer):
+            # Create buffer with smoother parameters
+            self._run_algorithm("native:buffer", {
+                'INPUT': input_layer,
+                'DISTANCE': distance,
+                'SEGMENTS': segments,  # 50 unless derived from the maximum deviation
+                'END_CAP_STYLE': 0,  # Round cap
+                'JOIN_STYLE': 1,  # Round join
+                'MITER_LIMIT': 2,
+                'DISSOLVE': False,
+                'OUTPUT': path
+            }, lambda context, results: self._show_buffer_layer(
+                path, layer_name, distance, crs, time.perf_counter() - start,
+                f"native:buffer, {segments} segments", segments_report), input_layer)
+
+        # Reproject each feature just before buffering rather than copying the layer first
+        if layer.crs() != crs:
+            self._run_streaming_transform(
+                layer, crs, path, QgsWkbTypes.MultiPolygon,
+                lambda geom: geom.buffer(distance, segments, QgsGeometry.CapRound, QgsGeometry.JoinStyleRound, 2),
+                f"Buffering {layer.name()}",
+                lambda elapsed, report: self._show_buffer_layer(
+                    path, layer_name, distance, crs, elapsed,
+                    f"streaming reprojection, {segments} segments", segments_report + report))
+        else:
+            buffer_layer(layer)
+
+    def _run_streaming_transform(self, layer, crs, path, wkb_type, transform_geometry, description, on_done):
+        """Reproject a layer to ``crs`` feature by feature while applying ``transform_geometry``.
 
+        ``on_done(elapsed, report)`` receives the run time and a line with the
+        feature count and the peak memory the pipeline added for the result dialog.
+        """
+        source = QgsVectorLayerFeatureSource(layer)
+        feature_count = layer.featureCount()
+        fields = layer.fields()
+        transform_context = QgsProject.instance().transformContext()
+        request = QgsFeatureRequest().setDestinationCrs(crs, transform_context)
+
+        def work(feedback):
+            start = time.perf_counter()
+            with MemorySampler() as memory:
+                count = write_transformed_features(source, request, fields, wkb_type, crs, transform_context,
+                                                   path, transform_geometry, feedback, feature_count)
+            return count, time.perf_counter() - start, memory.peak_delta_mb
+
+        def on_success(result):
+            count, elapsed, peak_delta = result
+            report = f"\nStreamed {count} features"
+            if peak_delta is not None:
+                report += f", peak memory +{peak_delta:.0f} MB over the starting value"
+            on_done(elapsed, report)
+
+        self._run_in_background(description, work, on_success)
+
+    def _create_buffer_parallel(self, layer, path, layer_name, distance, crs, segments, segments_report):
+        """Buffer a layer with buffer_features_parallel in a background task"""
+        source = QgsVectorLayerFeatureSource(layer)
+        feature_count = layer.featureCount()
+        fields = layer.fields()
+        transform_context = QgsProject.instance().transformContext()
+
+        # Reproject while reading instead of writing a reprojected copy first
+        request = QgsFeatureRequest()
+        if layer.crs() != crs:
+            request.setDestinationCrs(crs, transform_context)
+
+        def work(feedback):
+            start = time.perf_counter()
+            count = buffer_features_parallel(source, request, fields, crs, transform_context, path,
+                                             distance, segments, DEFAULT_EXPORT_WORKERS, feedback, feature_count)
+            return count, time.perf_counter() - start
+
+        def on_success(result):
+            count, elapsed = result
+            self._show_buffer_layer(path, layer_name, distance, crs, elapsed,
+                                    f"{count} features, {DEFAULT_EXPORT_WORKERS} workers, {segments} segments",
+                                    segments_report)
+
+        self._run_in_background(f"Buffering {layer.name()}", work, on_success, "Buffer Error")
+
+    def _show_buffer_layer(self, path, layer_name, distance, crs, elapsed, engine_label, details=""):
+        """Add a buffer output to the project and zoom to it"""
         buffer_layer = QgsVectorLayer(path, layer_name, "ogr")
         if not buffer_layer.isValid():
             QMessageBox.critical(self, "Error", "Failed to create buffer layer!")
@@ -873,7 +3573,8 @@ class PhotogrammetryToolsDock(QDockWidget):
 
         QMessageBox.information(self, "Success",
                                 f"{distance}m buffer created with smooth edges\n"
-                                f"Output CRS: {crs.description()}")
+                                f"Output CRS: {crs.description()}\n"
+                                f"Time: {elapsed:.2f} s ({engine_label})" + details)
 
     def create_vector_layer(self):
         """Create empty vector layer with proper CRS handling - supports both file and temporary layers"""
@@ -995,21 +3696,23 @@ class PhotogrammetryToolsDock(QDockWidget):
 
         layer_name = os.path.splitext(os.path.basename(path))[0]
 
-        # Ensure layer is in correct CRS
+        def convert_layer(input_layer):
+            self._run_algorithm("native:polygonstolines", {
+                'INPUT': input_layer,
+                'OUTPUT': path
+            }, lambda context, results: self._show_line_layer(path, layer_name, crs), input_layer)
+
+        # Reproject each feature just before converting it rather than copying the layer first
         if layer.crs() != crs:
-            # Create in-memory reprojected layer
-            reprojected_layer = processing.run("native:reprojectlayer", {
-                'INPUT': layer,
-                'TARGET_CRS': crs,
-                'OUTPUT': 'memory:'
-            })['OUTPUT']
-            layer = reprojected_layer
-
-        processing.run("native:polygonstolines", {
-            'INPUT': layer,
-            'OUTPUT': path
-        })
+            self._run_streaming_transform(
+                layer, crs, path, QgsWkbTypes.MultiLineString, polygon_boundary,
+                f"Converting {layer.name()} to lines",
+                lambda elapsed, report: self._show_line_layer(path, layer_name, crs, report))
+        else:
+            convert_layer(layer)
 
+    def _show_line_layer(self, path, layer_name, crs, details=""):
+        """Add a polygons to lines output to the project"""
         line_layer = QgsVectorLayer(path, layer_name, "ogr")
         QgsProject.instance().addMapLayer(line_layer)
 
@@ -1019,7 +3722,7 @@ class PhotogrammetryToolsDock(QDockWidget):
         self.iface.mapCanvas().refresh()
 
         QMessageBox.information(self, "Success",
-                                f"Lines created with CRS: {crs.description()}")
+                                f"Lines created with CRS: {crs.description()}" + details)
 
     def generate_line_intersections(self):
         """Generate intersection points from two line layers"""
@@ -1061,39 +3764,136 @@ class PhotogrammetryToolsDock(QDockWidget):
             return
 
         layer_name = os.path.splitext(os.path.basename(path))[0]
+        start = time.perf_counter()
+
+        if self.intersection_engine_combo.currentData() == "native":
+            self._generate_intersections_native(layer1, layer2, path, layer_name, crs)
+            return
+
+        # Intersections come out in the CRS of the first layer, reproject them while writing
+        if layer1.crs() == crs:
+            output = path
+        else:
+            output = 'memory:'
 
         # Create intersection points
-        processing.run("native:lineintersections", {
+        self._run_algorithm("native:lineintersections", {
             'INPUT': layer1,
             'INTERSECT': layer2,
             'INPUT_FIELDS': [],
             'INTERSECT_FIELDS': [],
-            'OUTPUT': path
-        })
-
-        intersection_layer = QgsVectorLayer(path, layer_name, "ogr")
-        if intersection_layer.isValid():
-            # Reproject to selected CRS if needed
-            if intersection_layer.crs() != crs:
-                reprojected_path = os.path.join(os.path.dirname(path), "temp_intersections.shp")
-                processing.run("native:reprojectlayer", {
-                    'INPUT': intersection_layer,
-                    'TARGET_CRS': crs,
-                    'OUTPUT': reprojected_path
-                })
-                intersection_layer = QgsVectorLayer(reprojected_path, layer_name, "ogr")
-
-            QgsProject.instance().addMapLayer(intersection_layer)
+            'OUTPUT': output
+        }, lambda context, results: self._intersections_created(
+            context, results['OUTPUT'], path, layer_name, crs, start))
+
+    def _intersections_created(self, context, output, path, layer_name, crs, start):
+        """Load the intersection points, writing them reprojected to the working CRS if needed"""
+        if output == path:
+            self._show_intersection_layer(QgsVectorLayer(path, layer_name, "ogr"), crs,
+                                          time.perf_counter() - start, "native:lineintersections")
+            return
 
-            # Set project CRS for consistent measurements
-            QgsProject.instance().setCrs(crs)
-            self.iface.mapCanvas().setDestinationCrs(crs)
-            self.iface.mapCanvas().refresh()
+        points_layer = context.takeResultLayer(output)
+        source = QgsVectorLayerFeatureSource(points_layer)
+        feature_count = points_layer.featureCount()
+        fields = points_layer.fields()
+        wkb_type = points_layer.wkbType()
+        transform_context = QgsProject.instance().transformContext()
+        request = QgsFeatureRequest().setDestinationCrs(crs, transform_context)
+
+        self._run_in_background(
+            f"Writing intersections to {layer_name}",
+            lambda feedback: write_transformed_features(source, request, fields, wkb_type, crs,
+                                                        transform_context, path, None, feedback, feature_count),
+            lambda count: self._show_intersection_layer(QgsVectorLayer(path, layer_name, "ogr"), crs,
+                                                        time.perf_counter() - start, "native:lineintersections"),
+            "Intersection Error"
+        )
 
-            QMessageBox.information(self, "Success",
-                                    f"Intersection points created with CRS: {crs.description()}")
-        else:
+    def _generate_intersections_native(self, layer1, layer2, path, layer_name, crs):
+        """Intersect two line layers with the native segment engine in a background task"""
+        if not self._check_dependencies():
+            return
+
+        source1 = QgsVectorLayerFeatureSource(layer1)
+        source2 = QgsVectorLayerFeatureSource(layer2)
+        feature_counts = (layer1.featureCount(), layer2.featureCount())
+        fields = combine_fields(layer1.fields(), layer2.fields())
+        transform_context = QgsProject.instance().transformContext()
+        request = QgsFeatureRequest().setDestinationCrs(crs, transform_context)
+
+        def work(feedback):
+            start = time.perf_counter()
+            line_intersections(source1, source2, request, fields, crs, transform_context, path,
+                               DEFAULT_EXPORT_WORKERS, feedback, feature_counts)
+            return time.perf_counter() - start
+
+        self._run_in_background(
+            f"Intersecting {layer1.name()} and {layer2.name()}",
+            work,
+            lambda elapsed: self._show_intersection_layer(QgsVectorLayer(path, layer_name, "ogr"), crs, elapsed,
+                                                          f"native segments, {DEFAULT_EXPORT_WORKERS} workers"),
+            "Intersection Error"
+        )
+
+    def find_line_crossings(self):
+        """Find where lines of the active layer cross each other"""
+        layer = self.iface.activeLayer()
+        if not layer or layer.type() != QgsVectorLayer.VectorLayer or \
+                layer.geometryType() != QgsWkbTypes.LineGeometry:
+            QMessageBox.warning(self, "Invalid Layer", "Please select a line layer!")
+            return
+
+        # Get CRS
+        crs = self.get_selected_crs()
+        if not crs:
+            return
+
+        if not self._check_dependencies():
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Save Crossing Points", "", "Shapefiles (*.shp)")
+        if not path:
+            return
+
+        layer_name = os.path.splitext(os.path.basename(path))[0]
+        source = QgsVectorLayerFeatureSource(layer)
+        transform_context = QgsProject.instance().transformContext()
+        request = QgsFeatureRequest().setDestinationCrs(crs, transform_context)
+        include_touches = self.crossing_touches_check.isChecked()
+        feature_count = layer.featureCount()
+
+        def work(feedback):
+            start = time.perf_counter()
+            line_crossings(source, request, crs, transform_context, path, DEFAULT_EXPORT_WORKERS, feedback,
+                           include_touches, feature_count)
+            return time.perf_counter() - start
+
+        self._run_in_background(
+            f"Finding line crossings in {layer.name()}",
+            work,
+            lambda elapsed: self._show_intersection_layer(QgsVectorLayer(path, layer_name, "ogr"), crs, elapsed,
+                                                          f"single layer crossings, {DEFAULT_EXPORT_WORKERS} workers"),
+            "Crossing Error"
+        )
+
+    def _show_intersection_layer(self, intersection_layer, crs, elapsed, engine_label):
+        """Add an intersection points output to the project"""
+        if not intersection_layer.isValid():
             QMessageBox.critical(self, "Error", "Failed to create intersection layer!")
+            return
+
+        QgsProject.instance().addMapLayer(intersection_layer)
+
+        # Set project CRS for consistent measurements
+        QgsProject.instance().setCrs(crs)
+        self.iface.mapCanvas().setDestinationCrs(crs)
+        self.iface.mapCanvas().refresh()
+
+        QMessageBox.information(self, "Success",
+                                f"Intersection points created with CRS: {crs.description()}\n"
+                                f"Points: {intersection_layer.featureCount()}, time: {elapsed:.2f} s "
+                                f"({engine_label})")
 
     def merge_vector_layers(self):
         """Merge multiple vector layers of the same geometry type"""
@@ -1162,7 +3962,13 @@ class PhotogrammetryToolsDock(QDockWidget):
             return
 
         # Get output path
-        path, _ = QFileDialog.getSaveFileName(self, "Save Merged Layer", "", "Shapefiles (*.shp)")
+        merge_engine = self.merge_engine_combo.currentData()
+        streaming = merge_engine in ("streaming", "parallel")
+        if streaming:
+            file_filter = "GeoPackage (*.gpkg);;FlatGeobuf (*.fgb)"
+        else:
+            file_filter = "Shapefiles (*.shp)"
+        path, _ = QFileDialog.getSaveFileName(self, "Save Merged Layer", "", file_filter)
         if not path:
             return
 
@@ -1172,40 +3978,74 @@ class PhotogrammetryToolsDock(QDockWidget):
         layers_to_merge = [layer for layer in available_layers
                            if layer.name() in selected_layers]
 
-        try:
-            # Merge layers using QGIS algorithm
-            processing.run("native:mergevectorlayers", {
-                'LAYERS': layers_to_merge,
-                'CRS': crs,
-                'OUTPUT': path
-            })
+        if streaming:
+            workers = DEFAULT_EXPORT_WORKERS if merge_engine == "parallel" else 1
+            self._merge_layers_streaming(layers_to_merge, path, layer_name, crs, workers)
+            return
 
-            # Load the merged layer
-            merged_layer = QgsVectorLayer(path, layer_name, "ogr")
-            if merged_layer.isValid():
-                QgsProject.instance().addMapLayer(merged_layer)
+        # Merge layers using QGIS algorithm
+        self._run_algorithm("native:mergevectorlayers", {
+            'LAYERS': layers_to_merge,
+            'CRS': crs,
+            'OUTPUT': path
+        }, lambda context, results: self._show_merged_layer(path, layer_name, len(selected_layers), crs))
 
-                # Set project CRS for consistent measurements
-                QgsProject.instance().setCrs(crs)
-                self.iface.mapCanvas().setDestinationCrs(crs)
-                self.iface.mapCanvas().refresh()
+    def _merge_layers_streaming(self, layers, path, layer_name, crs, workers):
+        """Merge layers with merge_layers_streaming in a background task"""
+        if driver_for_path(path) == "ESRI Shapefile":
+            path += ".gpkg"
+
+        transform_context = QgsProject.instance().transformContext()
+        fields = merge_output_fields([layer.fields() for layer in layers])
+        wkb_type = merge_output_wkb_type([layer.wkbType() for layer in layers])
+
+        inputs = []
+        for layer in layers:
+            request = QgsFeatureRequest()
+            if layer.crs() != crs:
+                request.setDestinationCrs(crs, transform_context)
+            inputs.append((QgsVectorLayerFeatureSource(layer), layer.fields(), request,
+                           layer.name(), layer.source(), layer.featureCount()))
+
+        def work(feedback):
+            start = time.perf_counter()
+            count = merge_layers_streaming(inputs, fields, wkb_type, crs, transform_context, path, workers, feedback)
+            return count, time.perf_counter() - start
+
+        def on_success(result):
+            count, elapsed = result
+            self.iface.messageBar().pushInfo(
+                "Merge", f"Merged {count} features in {elapsed:.2f} s "
+                         f"({count / max(elapsed, 1e-9):.0f} features/s, {workers} reader(s))")
+            self._show_merged_layer(path, layer_name, len(layers), crs)
+
+        self._run_in_background(f"Merging {len(layers)} layers", work, on_success, "Merge Error")
+
+    def _show_merged_layer(self, path, layer_name, layer_count, crs):
+        """Add a merge output to the project and zoom to it"""
+        # Load the merged layer
+        merged_layer = QgsVectorLayer(path, layer_name, "ogr")
+        if merged_layer.isValid():
+            QgsProject.instance().addMapLayer(merged_layer)
 
-                # Zoom to layer for verification
-                self.iface.mapCanvas().setExtent(merged_layer.extent())
-                self.iface.mapCanvas().refresh()
+            # Set project CRS for consistent measurements
+            QgsProject.instance().setCrs(crs)
+            self.iface.mapCanvas().setDestinationCrs(crs)
+            self.iface.mapCanvas().refresh()
 
-                # Count total features
-                total_features = merged_layer.featureCount()
+            # Zoom to layer for verification
+            self.iface.mapCanvas().setExtent(merged_layer.extent())
+            self.iface.mapCanvas().refresh()
 
-                QMessageBox.information(self, "Success",
-                                        f"Successfully merged {len(selected_layers)} layers\n"
-                                        f"Total features: {total_features}\n"
-                                        f"Output CRS: {crs.description()}")
-            else:
-                QMessageBox.critical(self, "Error", "Failed to load merged layer!")
+            # Count total features
+            total_features = merged_layer.featureCount()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Merge Error", f"Failed to merge layers:\n{str(e)}")
+            QMessageBox.information(self, "Success",
+                                    f"Successfully merged {layer_count} layers\n"
+                                    f"Total features: {total_features}\n"
+                                    f"Output CRS: {crs.description()}")
+        else:
+            QMessageBox.critical(self, "Error", "Failed to load merged layer!")
 
     def _multi_select_dialog(self, title, label, items):
         """Helper function to create a multi-selection dialog"""
@@ -1442,59 +4282,116 @@ class PhotogrammetryToolsDock(QDockWidget):
             )
 
     def save_selected_features(self):
-        """Save selected features to a new shapefile"""
+        """Save selected features to a new shapefile, GeoPackage or FlatGeobuf file"""
         layer = self.iface.activeLayer()
         if not layer or layer.type() != QgsVectorLayer.VectorLayer:
             QMessageBox.warning(self, "Invalid Layer", "Please select a vector layer!")
             return
 
-        selected_features = layer.selectedFeatures()
-        if not selected_features:
+        if not layer.selectedFeatureCount():
             QMessageBox.warning(self, "No Selection", "No features selected!")
             return
 
+        if self.export_append_check.isChecked():
+            self.append_selected_features(layer)
+            return
+
         # Get output file path
         output_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Selected Features",
             QgsProject.instance().homePath(),
-            "Shapefiles (*.shp)"
+            "Shapefiles (*.shp);;GeoPackage (*.gpkg);;FlatGeobuf (*.fgb)"
         )
         if not output_path:
             return
 
-        # Create save options
-        save_options = QgsVectorFileWriter.SaveVectorOptions()
-        save_options.driverName = "ESRI Shapefile"
-        save_options.fileEncoding = "UTF-8"
-        save_options.onlySelectedFeatures = True
-
-        # Write to new shapefile
+        # Write to the new file in the background, paging through the selected ids
+        selected_ids = list(layer.selectedFeatureIds())
+        source = QgsVectorLayerFeatureSource(layer)
+        fields = layer.fields()
+        wkb_type = layer.wkbType()
+        crs = layer.crs()
         transform_context = QgsProject.instance().transformContext()
 
-        # Capture all three return values
-        result = QgsVectorFileWriter.writeAsVectorFormatV3(
-            layer,
-            output_path,
-            transform_context,
-            save_options
+        def work(feedback):
+            start = time.perf_counter()
+            count = write_selected_features(source, selected_ids, fields, wkb_type, crs, transform_context,
+                                            output_path, feedback)
+            return count, time.perf_counter() - start
+
+        self._run_in_background(
+            f"Saving {len(selected_ids)} selected features",
+            work,
+            lambda result: self._show_saved_selection(output_path, *result),
+            "Save Error"
         )
 
-        # Unpack the result
-        error_code = result[0]
-        error_message = result[1]
+    def choose_deliverable(self):
+        """Pick the GeoPackage that appended selections are written to"""
+        path, _ = QFileDialog.getSaveFileName(self, "Deliverable GeoPackage",
+                                              QgsProject.instance().homePath(), "GeoPackage (*.gpkg)",
+                                              options=QFileDialog.DontConfirmOverwrite)
+        if not path:
+            return False
+        if not path.lower().endswith(".gpkg"):
+            path += ".gpkg"
+
+        self.close_deliverable()
+        self.deliverable = GeoPackageDeliverable(path)
+        self.iface.messageBar().pushInfo("Deliverable", f"Appending selections to {path}")
+        return True
+
+    def close_deliverable(self):
+        """Close the open deliverable GeoPackage tables"""
+        if self.deliverable:
+            self.deliverable.close()
+            self.deliverable = None
+
+    def append_selected_features(self, layer):
+        """Append the selection of a layer to a table of the deliverable GeoPackage"""
+        if self.deliverable is None and not self.choose_deliverable():
+            return
 
-        if error_code != QgsVectorFileWriter.NoError:
-            QMessageBox.critical(self, "Save Error",
-                                 f"Failed to save features:\n{error_message}")
+        table, ok = QInputDialog.getText(self, "Deliverable Table",
+                                         "Table name (existing tables are appended to):",
+                                         text=layer.name())
+        if not ok or not table.strip():
             return
+        table = table.strip()
+
+        deliverable = self.deliverable
+        selected_ids = list(layer.selectedFeatureIds())
+        source = QgsVectorLayerFeatureSource(layer)
+        fields = layer.fields()
+        wkb_type = QgsWkbTypes.multiType(layer.wkbType())
+        crs = layer.crs()
+        transform_context = QgsProject.instance().transformContext()
 
+        def work(feedback):
+            start = time.perf_counter()
+            count = deliverable.append(table, source, selected_ids, fields, wkb_type, crs, transform_context,
+                                       feedback)
+            return count, time.perf_counter() - start
+
+        def on_success(result):
+            count, elapsed = result
+            self.iface.messageBar().pushSuccess(
+                "Deliverable", f"Appended {count} features to {table} in {elapsed:.2f} s "
+                               f"({count / max(elapsed, 1e-9):.0f} features/s)")
+
+        self._run_in_background(f"Appending {len(selected_ids)} features to {table}", work, on_success,
+                                "Save Error")
+
+    def _show_saved_selection(self, output_path, count, elapsed):
+        """Load the file written by save_selected_features"""
         # Load the saved layer
         saved_layer = QgsVectorLayer(output_path, os.path.splitext(os.path.basename(output_path))[0], "ogr")
         if saved_layer.isValid():
             QgsProject.instance().addMapLayer(saved_layer)
             QMessageBox.information(self, "Success",
-                                    f"Saved {len(selected_features)} features to:\n{output_path}")
+                                    f"Saved {count} features to:\n{output_path}\n"
+                                    f"Time: {elapsed:.2f} s ({count / max(elapsed, 1e-9):.0f} features/s)")
         else:
             QMessageBox.warning(self, "Load Error",
                                 "Features saved successfully but could not load the layer.")
@@ -1516,7 +4413,12 @@ class PhotogrammetryToolsDock(QDockWidget):
         self.update_attribute("QCRemarks", remark, "QC remarks")
 
     def update_attribute(self, field_name, value, description):
-        """Generic method to update attributes"""
+        """Generic method to update attributes of the selected features.
+
+        Only the selected feature ids are read. Outside edit mode the new
+        value is written to the data provider in a single batched call, a
+        layer that is already being edited keeps using its edit buffer.
+        """
         layer = self.iface.activeLayer()
         if not layer or layer.type() != QgsVectorLayer.VectorLayer:
             QMessageBox.warning(self, "Invalid Layer", "Please select a vector layer!")
@@ -1527,21 +4429,393 @@ class PhotogrammetryToolsDock(QDockWidget):
             QMessageBox.warning(self, "Missing Field", f"'{field_name}' field not found!")
             return
 
-        selected = layer.selectedFeatures()
-        if not selected:
+        selected_ids = layer.selectedFeatureIds()
+        if not selected_ids:
             QMessageBox.warning(self, "No Selection", "Please select features first!")
             return
 
-        layer.startEditing()
-        for feature in selected:
-            layer.changeAttributeValue(feature.id(), field_index, value)
-        layer.commitChanges()
+        start = time.perf_counter()
+
+        # Convert once, the value is the same for every feature
+        converted_value = self._convert_value_for_field(value, layer.fields().at(field_index).type())
+
+        cache = self._attribute_caches.get(layer.id())
+
+        if self.write_behind_check.isChecked():
+            self._write_behind(layer, field_index, field_name, converted_value, selected_ids, description, value)
+            return
+
+        provider = layer.dataProvider()
+        provider_index = provider.fields().indexFromName(field_name)
+        was_editable = layer.isEditable()
+        use_provider = (not was_editable and provider_index != -1 and
+                        bool(provider.capabilities() & QgsVectorDataProvider.ChangeAttributeValues))
+
+        try:
+            if use_provider:
+                attribute_map = {feature_id: {provider_index: converted_value} for feature_id in selected_ids}
+                if not provider.changeAttributeValues(attribute_map):
+                    raise RuntimeError(provider.error().message())
+
+                # The layer did not see the change, reload so the attribute table is current
+                if cache is not None:
+                    cache.reload_layer()
+                    cache.set_values(selected_ids, field_name, converted_value)
+                else:
+                    layer.reload()
+                layer.triggerRepaint()
+            else:
+                layer.startEditing()
+                for feature_id in selected_ids:
+                    layer.changeAttributeValue(feature_id, field_index, converted_value)
+                layer.commitChanges()
+        except Exception as e:
+            # Never discard an edit session the user started
+            if layer.isEditable() and not was_editable:
+                layer.rollBack()
+            QMessageBox.critical(self, "Update Error",
+                                 f"Failed to update {field_name}:\n{str(e)}")
+            return
 
+        elapsed = time.perf_counter() - start
         self.iface.messageBar().pushSuccess(
             f"{field_name} Updated",
-            f"Set {description} for {len(selected)} features to '{value}'"
+            f"Set {description} for {len(selected_ids)} features to '{value}' in {elapsed:.2f} s"
         )
 
+    # =========================================
+    # Attribute Cache
+    # =========================================
+
+    def attribute_cache(self, layer):
+        """Up to date LayerAttributeCache of a layer, None when numpy is not installed"""
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            return None
+
+        cache = self._attribute_caches.get(layer.id())
+        if cache is None:
+            cache = LayerAttributeCache(layer)
+            self._attribute_caches[layer.id()] = cache
+        cache.ensure()
+        return cache
+
+    def _drop_attribute_cache(self, layer_id):
+        cache = self._attribute_caches.pop(layer_id, None)
+        if cache is not None:
+            if self._dashboard is not None and self._dashboard.cache is cache:
+                self._stop_dashboard()
+                self.dashboard_label.setText("")
+            cache.disconnect()
+
+    def drop_attribute_caches(self):
+        """Disconnect every attribute cache from its layer, used when the plugin is unloaded"""
+        QgsProject.instance().layerWillBeRemoved.disconnect(self._drop_attribute_cache)
+        for layer_id in list(self._attribute_caches):
+            self._drop_attribute_cache(layer_id)
+
+    def _cached_layer(self, fields):
+        """Active vector layer and its attribute cache, after checking the fields exist"""
+        layer = self.iface.activeLayer()
+        if not layer or layer.type() != QgsVectorLayer.VectorLayer:
+            QMessageBox.warning(self, "Invalid Layer", "Please select a vector layer!")
+            return None, None
+
+        missing = [name for name in fields if layer.fields().indexFromName(name) == -1]
+        if missing:
+            QMessageBox.warning(self, "Missing Field", f"Field(s) not found: {', '.join(missing)}")
+            return None, None
+
+        if not self._check_dependencies():
+            return None, None
+        return layer, self.attribute_cache(layer)
+
+    def show_progress_summary(self):
+        """Show Status, Remarks and QC counts of the active layer from the attribute cache"""
+        layer, cache = self._cached_layer(["Status"])
+        if cache is None:
+            return
+
+        lines = [f"Features: {len(cache.row_of)}"]
+        for field_name in ("Status", "Remarks", "QC"):
+            if field_name not in cache.codes:
+                continue
+            lines.append(f"\n{field_name}:")
+            counts = cache.value_counts(field_name)
+            for value, count in sorted(counts.items(), key=lambda item: -item[1]):
+                lines.append(f"  {value if value is not None else 'NULL'}: {count}")
+
+        QMessageBox.information(self, f"Progress - {layer.name()}", "\n".join(lines))
+
+    def select_by_field_value(self):
+        """Select the features of the active layer whose Bridge field holds the given value"""
+        field_name = self.filter_field_combo.currentText()
+        layer, cache = self._cached_layer([field_name])
+        if cache is None:
+            return
+
+        text = self.filter_value_input.text().strip()
+        value = self._convert_value_for_field(text, layer.fields().field(field_name).type()) if text else None
+        feature_ids = cache.ids_where(field_name, value)
+        layer.selectByIds(feature_ids)
+        self.iface.messageBar().pushInfo("Selection", f"Selected {len(feature_ids)} features with "
+                                                      f"{field_name} = {text or 'NULL'}")
+
+    def start_dashboard(self):
+        """Show live QC counts of the active layer grouped by Part or Assign"""
+        group_field = self.dashboard_group_combo.currentText()
+        layer, cache = self._cached_layer([group_field])
+        if cache is None:
+            return
+
+        self._stop_dashboard()
+        start = time.perf_counter()
+        self._dashboard = QcProgressCounts(cache, group_field, self._mark_dashboard_row,
+                                           self._schedule_dashboard_rebuild)
+        self._rebuild_dashboard()
+        self.iface.messageBar().pushInfo("QC Dashboard",
+                                         f"Counted {len(cache.row_of)} features in {time.perf_counter() - start:.2f} s")
+
+    def _stop_dashboard(self):
+        if self._dashboard is not None:
+            self._dashboard.close()
+            self._dashboard = None
+        self._dashboard_rows = {}
+        self._dashboard_dirty = set()
+        self.dashboard_table.setRowCount(0)
+
+    def _schedule_dashboard_rebuild(self):
+        # The cache went stale in the middle of a commit or rollback, recount once it is over
+        QTimer.singleShot(0, self._rebuild_dashboard)
+
+    def _rebuild_dashboard(self):
+        """Full count, only at start and after the cache went stale"""
+        dashboard = self._dashboard
+        if dashboard is None or dashboard.valid:
+            return
+        dashboard.build()
+
+        self._dashboard_rows = {}
+        self._dashboard_dirty = set()
+        self.dashboard_table.setRowCount(0)
+
+        def sort_key(value):
+            numeric = isinstance(value, (int, float))
+            return value is None, not numeric, value if numeric else str(value)
+
+        for group_value in sorted(dashboard.counts, key=sort_key):
+            self._update_dashboard_row(group_value)
+        self.dashboard_label.setText(f"{dashboard.cache.layer.name()} by {dashboard.group_field}")
+
+    def _mark_dashboard_row(self, group_value):
+        # A batch edit changes many rows in one go, redraw each group once after it
+        if not self._dashboard_dirty:
+            QTimer.singleShot(0, self._flush_dashboard_rows)
+        self._dashboard_dirty.add(group_value)
+
+    def _flush_dashboard_rows(self):
+        dirty, self._dashboard_dirty = self._dashboard_dirty, set()
+        # A stale dashboard is redrawn in full by _rebuild_dashboard
+        if self._dashboard is None or not self._dashboard.valid:
+            return
+        for group_value in dirty:
+            self._update_dashboard_row(group_value)
+
+    def _update_dashboard_row(self, group_value):
+        """Refresh the table row of one group, reusing its items"""
+        counts = self._dashboard.counts.get(group_value)
+        row = self._dashboard_rows.get(group_value)
+        if row is None:
+            row = self.dashboard_table.rowCount()
+            self.dashboard_table.insertRow(row)
+            self._dashboard_rows[group_value] = row
+            self.dashboard_table.setItem(row, 0, QTableWidgetItem("NULL" if group_value is None else str(group_value)))
+
+        for column, count in enumerate(counts, start=1):
+            item = self.dashboard_table.item(row, column)
+            if item is None:
+                self.dashboard_table.setItem(row, column, QTableWidgetItem(str(count)))
+            else:
+                item.setText(str(count))
+
+    # =========================================
+    # Write-Behind Status Edits
+    # =========================================
+
+    def _write_behind(self, layer, field_index, field_name, converted_value, selected_ids, description, value):
+        """Apply a status edit to the edit buffer now and commit it later in one batch.
+
+        Only edit sessions the plugin starts itself are committed
+        automatically. A layer the user is already editing just gets the
+        value in its edit buffer, and editing a plugin session by hand
+        hands that session over to the user.
+        """
+        if layer.id() in self._write_behind_layers and not layer.isEditable():
+            # Saved or discarded by the user since the last click
+            self._release_edit_session(layer)
+
+        owned = layer.id() in self._write_behind_layers
+        if layer.isEditable() and not owned:
+            for feature_id in selected_ids:
+                layer.changeAttributeValue(feature_id, field_index, converted_value)
+            layer.triggerRepaint()
+            self.iface.messageBar().pushInfo(
+                f"{field_name} Updated",
+                f"Set {description} for {len(selected_ids)} features to '{value}' in your edit session of "
+                f"{layer.name()}, save it to keep the change")
+            return
+
+        # Values on disk before the click, a crash replay only writes features still holding them
+        provider = layer.dataProvider()
+        provider_index = provider.fields().indexFromName(field_name)
+        before_values = {}
+        if provider_index != -1:
+            request = QgsFeatureRequest().setFilterFids([fid for fid in selected_ids if fid >= 0])
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+            request.setSubsetOfAttributes([provider_index])
+            before_values = {feature.id(): _cache_value(feature.attributes()[provider_index])
+                             for feature in provider.getFeatures(request)}
+
+        if not owned and not layer.startEditing():
+            QMessageBox.critical(self, "Update Error", f"Cannot edit {layer.name()}!")
+            return
+
+        # Journal first, so a crash after this point cannot lose the click
+        try:
+            self._write_behind_journal.append(layer, field_name, converted_value, selected_ids, before_values)
+        except OSError as e:
+            if not owned:
+                layer.rollBack()
+            QMessageBox.critical(self, "Journal Error", f"Cannot record the edit, nothing was changed:\n{str(e)}")
+            return
+
+        if not owned:
+            self._own_edit_session(layer)
+        self._writing_behind = True
+        try:
+            for feature_id in selected_ids:
+                layer.changeAttributeValue(feature_id, field_index, converted_value)
+        finally:
+            self._writing_behind = False
+        layer.triggerRepaint()
+
+        self._flush_timer.start(WRITE_BEHIND_DELAY_MS)
+        self.iface.messageBar().pushInfo(
+            f"{field_name} Updated",
+            f"Set {description} for {len(selected_ids)} features to '{value}' (saving in "
+            f"{WRITE_BEHIND_DELAY_MS // 1000} s, {len(self._write_behind_layers)} layer(s) pending)")
+
+    @staticmethod
+    def _edit_signals(layer):
+        """Layer signals of every kind of edit"""
+        return (layer.attributeValueChanged, layer.featureAdded, layer.featureDeleted,
+                layer.geometryChanged, layer.attributeAdded, layer.attributeDeleted)
+
+    def _own_edit_session(self, layer):
+        """Remember an edit session started for write-behind and watch it for edits by hand"""
+        def edited(*args):
+            if not self._writing_behind:
+                self._edited_by_hand(layer)
+
+        for signal in self._edit_signals(layer):
+            signal.connect(edited)
+        self._write_behind_layers[layer.id()] = (layer, edited)
+
+    def _release_edit_session(self, layer):
+        """Stop committing a layer automatically, its session was saved, discarded or taken over"""
+        _, edited = self._write_behind_layers.pop(layer.id())
+        for signal in self._edit_signals(layer):
+            signal.disconnect(edited)
+        self._write_behind_journal.remove_layer(layer)
+
+    def _edited_by_hand(self, layer):
+        self._release_edit_session(layer)
+        self.iface.messageBar().pushWarning(
+            "Deferred Save", f"{layer.name()} was changed outside the status buttons, its pending status edits "
+                             "stay in the edit session and are no longer saved automatically")
+
+    def flush_pending_edits(self):
+        """Commit every edit session the plugin started for write-behind edits"""
+        self._flush_timer.stop()
+        for layer, _ in list(self._write_behind_layers.values()):
+            self._flush_layer(layer)
+
+    def close_write_behind(self):
+        """Commit the pending edits and stop following layer removal, used when the plugin is unloaded"""
+        QgsProject.instance().layerWillBeRemoved.disconnect(self._flush_removed_layer)
+        self.flush_pending_edits()
+
+    def _flush_layer(self, layer):
+        # Saved or discarded by the user in the meantime, either way nothing is pending
+        if layer.isEditable():
+            self._writing_behind = True
+            try:
+                committed = layer.commitChanges()
+            finally:
+                self._writing_behind = False
+            if not committed:
+                self.iface.messageBar().pushWarning(
+                    "Deferred Save", f"Could not save {layer.name()}, will retry: {'; '.join(layer.commitErrors())}")
+                self._flush_timer.start(WRITE_BEHIND_DELAY_MS)
+                return False
+
+        self._release_edit_session(layer)
+        return True
+
+    def _flush_removed_layer(self, layer_id):
+        entry = self._write_behind_layers.get(layer_id)
+        if entry is not None:
+            self._flush_layer(entry[0])
+
+    def _write_behind_toggled(self, enabled):
+        if not enabled:
+            self.flush_pending_edits()
+
+    def _replay_write_behind_journal(self):
+        """Offer to write status edits left in the journal by a crash, after checking the disk"""
+        if not self._write_behind_journal.entries():
+            return
+
+        plans = self._write_behind_journal.replay_plan()
+        lines = []
+        for plan in plans:
+            lines.append(plan["source"])
+            if plan["layer"] is None:
+                lines.append("    cannot be opened")
+                continue
+            if plan["changes"]:
+                lines.append(f"    write {len(plan['changes'])} feature(s): {format_feature_ids(plan['changes'])}")
+            if plan["saved"]:
+                lines.append(f"    {plan['saved']} edit(s) already saved")
+            if plan["conflicts"]:
+                lines.append(f"    skip {len(plan['conflicts'])} edit(s) changed on disk since: "
+                             f"{format_feature_ids({fid for fid, _ in plan['conflicts']})}")
+
+        if not any(plan["changes"] for plan in plans) and all(plan["layer"] is not None for plan in plans):
+            self._write_behind_journal.clear()
+            QMessageBox.information(self, "Recover Status Edits",
+                                    "Status edits left unsaved when QGIS last closed need no recovery:\n\n" +
+                                    "\n".join(lines))
+            return
+
+        reply = QMessageBox.question(
+            self, "Recover Status Edits",
+            "Some status edits were not saved when QGIS last closed:\n\n" + "\n".join(lines) +
+            "\n\nWrite them to their layers now? (No discards them)",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if reply != QMessageBox.Yes:
+            self._write_behind_journal.clear()
+            return
+
+        updated, failed = self._write_behind_journal.replay(plans)
+        if failed:
+            QMessageBox.warning(self, "Recover Status Edits",
+                                f"Recovered {updated} feature(s), could not write to:\n" + "\n".join(failed) +
+                                "\n\nThe journal is kept for the next start.")
+        else:
+            self.iface.messageBar().pushSuccess("Recover Status Edits", f"Recovered {updated} feature(s)")
+
 
 class PhotogrammetryToolsPlugin:
     def __init__(self, iface):
@@ -1588,6 +4862,10 @@ class PhotogrammetryToolsPlugin:
 
         # Remove dock widget
         if self.dock_widget:
+            self.dock_widget.close_write_behind()
+            self.dock_widget.close_deliverable()
+            self.dock_widget.drop_attribute_caches()
+            self.dock_widget._stop_dashboard()
             self.iface.removeDockWidget(self.dock_widget)
             self.dock_widget.deleteLater()
             self.dock_widget = None
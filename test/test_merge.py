@@ -0,0 +1,97 @@
+"""Tests for the streaming layer merge.
+
+The merge reads memory layers through QgsVectorLayerFeatureSource, as the
+dock does, with one and with several reader threads. Run from the plugin
+directory inside a QGIS Python environment:
+
+    python -m unittest discover -s test
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from qgis.core import (QgsApplication, QgsFeature, QgsFeatureRequest, QgsFeedback, QgsGeometry, QgsPointXY,
+                           QgsProject, QgsVectorLayer, QgsVectorLayerFeatureSource)
+    from photogrammetry_tools import merge_layers_streaming, merge_output_fields, merge_output_wkb_type
+except ImportError:
+    QgsApplication = None
+
+QGIS_APP = None
+
+
+def setUpModule():
+    global QGIS_APP
+    if QgsApplication is not None and QgsApplication.instance() is None:
+        QGIS_APP = QgsApplication([], False)
+        QGIS_APP.initQgis()
+
+
+def tearDownModule():
+    if QGIS_APP is not None:
+        QGIS_APP.exitQgis()
+
+
+def memory_layer(uri, name, rows):
+    """Memory point layer with one feature per (x, y, attributes...) row"""
+    layer = QgsVectorLayer(uri, name, "memory")
+    features = []
+    for x, y, *attributes in rows:
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(x, y)))
+        feature.setAttributes(attributes)
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+@unittest.skipIf(QgsApplication is None, "needs QGIS")
+class MergeLayersStreamingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.layers = [
+            memory_layer("Point?crs=EPSG:3857&field=name:string&field=id:integer", "a",
+                         [(0, 0, "a0", 1), (1, 1, "a1", 2)]),
+            memory_layer("Point?crs=EPSG:3857&field=name:string&field=id:string&field=fid:integer", "b",
+                         [(2, 2, "b0", "x", 7)]),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def merge(self, workers):
+        """Merge the layers like the dock does, returns (count, rows, progress)"""
+        crs = self.layers[0].crs()
+        inputs = [(QgsVectorLayerFeatureSource(layer), layer.fields(), QgsFeatureRequest(),
+                   layer.name(), layer.source(), layer.featureCount()) for layer in self.layers]
+        fields = merge_output_fields([layer.fields() for layer in self.layers])
+        wkb_type = merge_output_wkb_type([layer.wkbType() for layer in self.layers])
+        path = os.path.join(self.directory.name, f"merged_{workers}.gpkg")
+        feedback = QgsFeedback()
+
+        count = merge_layers_streaming(inputs, fields, wkb_type, crs, QgsProject.instance().transformContext(),
+                                       path, workers, feedback)
+
+        output = QgsVectorLayer(path, "merged", "ogr")
+        rows = []
+        for feature in output.getFeatures():
+            point = feature.geometry().asMultiPoint()[0]
+            rows.append((feature["layer"], feature["name"], feature["id"], point.x(), point.y()))
+        return count, rows, feedback.progress()
+
+    def test_merge(self):
+        expected = [("a", "a0", "1", 0.0, 0.0), ("a", "a1", "2", 1.0, 1.0), ("b", "b0", "x", 2.0, 2.0)]
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                count, rows, progress = self.merge(workers)
+                self.assertEqual(count, 3)
+                self.assertEqual(rows, expected)
+                self.assertEqual(progress, 100.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+"""Regression tests for the native segment intersection engine.
+
+The engine is compared with what native:lineintersections reports: the
+point parts of the GEOS intersection of every feature pair. The layer
+tests read memory layers through QgsVectorLayerFeatureSource, as the dock
+does. Run from the plugin directory inside a QGIS Python environment with
+NumPy installed:
+
+    python -m unittest discover -s test
+"""
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+    from qgis.core import (QgsApplication, QgsFeature, QgsFeatureRequest, QgsGeometry, QgsPointXY, QgsProject,
+                           QgsVectorLayer, QgsVectorLayerFeatureSource, QgsWkbTypes)
+    from photogrammetry_tools import combine_fields, line_crossings, line_intersections, segment_intersections
+except ImportError:
+    np = None
+
+QGIS_APP = None
+
+
+def setUpModule():
+    global QGIS_APP
+    if np is not None and QgsApplication.instance() is None:
+        QGIS_APP = QgsApplication([], False)
+        QGIS_APP.initQgis()
+
+
+def tearDownModule():
+    if QGIS_APP is not None:
+        QGIS_APP.exitQgis()
+
+
+def segment_array(lines):
+    """Segment and owner arrays of a list of vertex lists, one feature per line"""
+    segments = []
+    owners = []
+    for owner, vertices in enumerate(lines):
+        for start, end in zip(vertices[:-1], vertices[1:]):
+            segments.append(tuple(start) + tuple(end))
+            owners.append(owner)
+    return np.array(segments, dtype=float).reshape(-1, 4), np.array(owners, dtype=np.int64)
+
+
+def engine_points(lines_a, lines_b):
+    """{(index a, index b, x, y)} found by segment_intersections"""
+    segments_a, owners_a = segment_array(lines_a)
+    segments_b, owners_b = segment_array(lines_b)
+    owner_a, owner_b, x, y = segment_intersections(segments_a, owners_a, segments_b, owners_b, workers=2)
+    return {(int(a), int(b), round(float(px), 6), round(float(py), 6))
+            for a, b, px, py in zip(owner_a, owner_b, x, y)}
+
+
+def crossing_points(lines, endpoint_touches):
+    """{(index a, index b, x, y)} between the lines of one layer"""
+    segments, owners = segment_array(lines)
+    owner_a, owner_b, x, y = segment_intersections(segments, owners, segments, owners, same_layer=True,
+                                                   endpoint_touches=endpoint_touches)
+    return {(int(a), int(b), round(float(px), 6), round(float(py), 6))
+            for a, b, px, py in zip(owner_a, owner_b, x, y)}
+
+
+def geos_points(lines_a, lines_b):
+    """{(index a, index b, x, y)} as native:lineintersections finds them"""
+    points = set()
+    for index_a, vertices_a in enumerate(lines_a):
+        geom_a = QgsGeometry.fromPolylineXY([QgsPointXY(*vertex) for vertex in vertices_a])
+        for index_b, vertices_b in enumerate(lines_b):
+            geom_b = QgsGeometry.fromPolylineXY([QgsPointXY(*vertex) for vertex in vertices_b])
+            for part in geom_a.intersection(geom_b).asGeometryCollection():
+                if part.type() == QgsWkbTypes.PointGeometry:
+                    point = part.asPoint()
+                    points.add((index_a, index_b, round(point.x(), 6), round(point.y(), 6)))
+    return points
+
+
+def memory_layer(lines, name):
+    """Memory line layer with one feature per vertex list, named <name><index>"""
+    layer = QgsVectorLayer("LineString?crs=EPSG:3857&field=name:string", name, "memory")
+    features = []
+    for index, vertices in enumerate(lines):
+        feature = QgsFeature(layer.fields())
+        feature.setGeometry(QgsGeometry.fromPolylineXY([QgsPointXY(*vertex) for vertex in vertices]))
+        feature.setAttributes([f"{name}{index}"])
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def layer_request(layer):
+    """Request reprojecting to the layer's own CRS, like the dock's requests to the working CRS"""
+    return QgsFeatureRequest().setDestinationCrs(layer.crs(), QgsProject.instance().transformContext())
+
+
+def output_points(path, *field_names):
+    """{(attribute values..., x, y)} of a point output"""
+    layer = QgsVectorLayer(path, "points", "ogr")
+    points = set()
+    for feature in layer.getFeatures():
+        point = feature.geometry().asPoint()
+        points.add(tuple(feature[name] for name in field_names) + (round(point.x(), 6), round(point.y(), 6)))
+    return points
+
+
+def lattice_walks(count, steps, step_y, seed):
+    """Monotone random walks on an integer lattice, so shared stretches are common"""
+    rng = random.Random(seed)
+    walks = []
+    for _ in range(count):
+        x, y = rng.randint(0, 10), rng.randint(0, 10)
+        vertices = [(x, y)]
+        for _ in range(steps):
+            if rng.random() < 0.5:
+                x += 1
+            else:
+                y += step_y
+            vertices.append((x, y))
+        walks.append(vertices)
+    return walks
+
+
+@unittest.skipIf(np is None, "needs QGIS and NumPy")
+class SegmentIntersectionsTest(unittest.TestCase):
+
+    def test_crossing(self):
+        self.assertEqual(engine_points([[(0, 0), (10, 10)]], [[(0, 10), (10, 0)]]), {(0, 0, 5.0, 5.0)})
+
+    def test_shared_stretch_gives_no_points(self):
+        lines_a = [[(0, 0), (10, 0)]]
+        lines_b = [[(2, -1), (3, 0), (6, 0), (7, 1)]]
+        self.assertEqual(engine_points(lines_a, lines_b), set())
+        self.assertEqual(geos_points(lines_a, lines_b), set())
+
+    def test_crossing_beside_shared_stretch(self):
+        lines_a = [[(0, 0), (10, 0)]]
+        lines_b = [[(2, -1), (3, 0), (6, 0), (7, 1), (8, -1)]]
+        self.assertEqual(engine_points(lines_a, lines_b), {(0, 0, 7.5, 0.0)})
+
+    def test_collinear_end_to_end_touch(self):
+        lines_a = [[(0, 0), (10, 0)]]
+        lines_b = [[(10, 0), (20, 0)]]
+        self.assertEqual(engine_points(lines_a, lines_b), {(0, 0, 10.0, 0.0)})
+
+    def test_matches_native_lineintersections(self):
+        for seed in range(5):
+            lines_a = lattice_walks(20, 12, 1, seed)
+            lines_b = lattice_walks(20, 12, -1, seed + 100)
+            with self.subTest(seed=seed):
+                self.assertEqual(engine_points(lines_a, lines_b), geos_points(lines_a, lines_b))
+
+    def test_crossings_skip_endpoint_touches(self):
+        lines = [
+            [(0, 0), (10, 0), (10, 10)],
+            [(10, 10), (20, 10)],  # continues line 0 end to end
+            [(5, 5), (5, 0)],  # ends on line 0
+            [(2, -5), (2, 5)],  # crosses line 0
+            [(4, 0), (8, 0), (8, -5)],  # shares a stretch with line 0, line 2 ends on it
+        ]
+        self.assertEqual(crossing_points(lines, endpoint_touches=False), {(0, 3, 2.0, 0.0)})
+        self.assertEqual(crossing_points(lines, endpoint_touches=True),
+                         {(0, 1, 10.0, 10.0), (0, 2, 5.0, 0.0), (0, 3, 2.0, 0.0), (2, 4, 5.0, 0.0)})
+
+
+@unittest.skipIf(np is None, "needs QGIS and NumPy")
+class LayerIntersectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_line_intersections_from_layers(self):
+        layer_a = memory_layer([[(0, 0), (10, 10)], [(0, 0), (10, 0)]], "a")
+        layer_b = memory_layer([[(0, 10), (10, 0)], [(2, -1), (3, 0), (6, 0), (7, 1)]], "b")
+        path = os.path.join(self.directory.name, "intersections.gpkg")
+
+        count = line_intersections(QgsVectorLayerFeatureSource(layer_a), QgsVectorLayerFeatureSource(layer_b),
+                                   layer_request(layer_a), combine_fields(layer_a.fields(), layer_b.fields()),
+                                   layer_a.crs(), QgsProject.instance().transformContext(), path, 2, None,
+                                   (layer_a.featureCount(), layer_b.featureCount()))
+
+        self.assertEqual(count, 2)
+        self.assertEqual(output_points(path, "name", "name_2"),
+                         {("a0", "b0", 5.0, 5.0), ("a1", "b0", 10.0, 0.0)})
+
+    def test_line_crossings_from_layer(self):
+        layer = memory_layer([
+            [(0, 0), (10, 0), (10, 10)],
+            [(10, 10), (20, 10)],
+            [(5, 5), (5, 0)],
+            [(2, -5), (2, 5)],
+            [(4, 0), (8, 0), (8, -5)],
+        ], "line")
+        fids = {feature["name"]: feature.id() for feature in layer.getFeatures()}
+
+        for include_touches, expected in ((False, {("line0", "line3", 2.0, 0.0)}),
+                                          (True, {("line0", "line1", 10.0, 10.0), ("line0", "line2", 5.0, 0.0),
+                                                  ("line0", "line3", 2.0, 0.0), ("line2", "line4", 5.0, 0.0)})):
+            with self.subTest(include_touches=include_touches):
+                path = os.path.join(self.directory.name, f"crossings_{include_touches}.gpkg")
+                count = line_crossings(QgsVectorLayerFeatureSource(layer), layer_request(layer), layer.crs(),
+                                       QgsProject.instance().transformContext(), path, 2, None, include_touches,
+                                       layer.featureCount())
+
+                self.assertEqual(count, len(expected))
+                self.assertEqual(output_points(path, "FID_A", "FID_B"),
+                                 {(fids[a], fids[b], x, y) for a, b, x, y in expected})
+
+
+if __name__ == "__main__":
+    unittest.main()